@@ -0,0 +1,102 @@
+import csv
+import io
+import os
+import re
+import discord
+from dotenv import load_dotenv
+from excel_handler import get_roles_for_email
+from job_engine import JobKind, register_kind
+from Verification_Module.verify import grant_verification
+
+load_dotenv()
+
+# Members verified at the same time by one bulk job
+BULK_VERIFY_CONCURRENCY = int(os.getenv('BULK_VERIFY_CONCURRENCY', '3'))
+
+JOB_KIND = 'bulkverify'
+
+RESULT_LABELS = {
+    'verified': "Verified",
+    'already_verified': "Already verified",
+    'not_in_roster': "Email not in roster",
+    'not_in_server': "Not in server",
+    'roles_missing': "Roles not configured",
+    'invalid_row': "Invalid row",
+    'failed': "Failed",
+}
+
+_snowflake = re.compile(r'\d{15,20}')
+
+def parse_rows(data):
+    """Parse CSV bytes into ``(discord_id or None, email, raw_line)`` rows.
+
+    Columns are picked by a header naming them (``discord_id``/``user_id``/
+    ``id`` and ``email``); without a header the first column is the ID and
+    the second the email. IDs may also be given as mentions.
+    """
+    reader = csv.reader(io.StringIO(data.decode('utf-8-sig', errors='replace')))
+    rows = [row for row in reader if any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+
+    id_column, email_column = 0, 1
+    header = [cell.strip().lower() for cell in rows[0]]
+    if not _snowflake.search(rows[0][0] if rows[0] else ''):
+        id_column = next((header.index(name) for name in ('discord_id', 'user_id', 'discordid', 'id')
+                          if name in header), 0)
+        email_column = header.index('email') if 'email' in header else 1
+        rows = rows[1:]
+
+    parsed = []
+    for row in rows:
+        raw = ','.join(row)
+        match = _snowflake.search(row[id_column]) if len(row) > id_column else None
+        email = row[email_column].strip() if len(row) > email_column else ''
+        parsed.append((int(match.group()) if match else None, email, raw))
+    return parsed
+
+def resolve_rows(rows, bot_data):
+    """Look every row up in the roster index in one pass and build the job items."""
+    items = []
+    for discord_id, email, raw in rows:
+        payload = {'email': email, 'raw': raw}
+        if discord_id is None or not email:
+            items.append((discord_id, payload, 'invalid_row', "Needs a Discord ID and an email"))
+            continue
+        role_names = get_roles_for_email(email, bot_data['excel_data'], bot_data.get('roster_filter'))
+        if not role_names:
+            items.append((discord_id, payload, 'not_in_roster', ''))
+        else:
+            payload['roles'] = role_names
+            items.append((discord_id, payload, None, ''))
+    return items
+
+async def verify_item(guild, bot_data, job, item):
+    member_id = item['target_id']
+    email = item['payload']['email']
+    role_names = item['payload']['roles']
+
+    member = guild.get_member(member_id)
+    if member is None:
+        try:
+            member = await guild.fetch_member(member_id)
+        except discord.NotFound:
+            return 'not_in_server', ''
+
+    roles = bot_data['roles'].roles_for(role_names)
+    auto_assigned_role = bot_data['roles'].get('AUTO_ASSIGNED')
+    # Resumed jobs may reach members a previous run already updated
+    if roles and all(role in member.roles for role in roles) and auto_assigned_role not in member.roles:
+        return 'already_verified', ", ".join(role_names)
+
+    granted = await grant_verification(member, email, role_names)
+    if granted is None:
+        return 'roles_missing', ", ".join(role_names)
+    _, new_nickname = granted
+    return 'verified', ", ".join(role_names) + (f"; nickname {new_nickname}" if new_nickname else "")
+
+bulk_verify_kind = register_kind(JobKind(
+    JOB_KIND, "Bulk Verification", verify_item, RESULT_LABELS,
+    failures=('not_in_server', 'roles_missing', 'invalid_row', 'failed'),
+    concurrency=BULK_VERIFY_CONCURRENCY, report_columns=('email',)
+))
@@ -1,17 +1,15 @@
 import discord 
-import json
-from discord.ext import commands, tasks
-from excel_handler import get_roles_for_email, load_excel_data
+from discord.ext import commands
+from excel_handler import get_roles_for_email, load_excel_data, suggest_emails
+from fuzzy_match import mask_email
+from nickname import nickname_formatter
+from state_store import store
+from welcome_messages import welcome_dispatcher, welcome_tracker
+from Verification_Module.work_queue import verification_queue
 import os
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
-# File paths
-attempts_log = 'failed_attempts.json'
-verification_log = 'verification_loga.json'
-welcome_log = 'welcome_messages.json'
-username_log = 'username_updates.json'
-
 # Global variables for module
 bot = None
 tree = None
@@ -89,66 +87,43 @@ def register_commands():
 
 # Start tasks in this function to be called from on_ready
 def start_background_tasks():
-    cleanup_welcome_messages.start()
+    if not verification_queue.running:
+        verification_queue.start(bot.http)
+
+async def enqueue_verification(interaction, handler, *args):
+    # Acknowledge now; the member's roles and nickname are updated by a queue worker
+    busy_message = "Verification is very busy right now. Please try again in a minute."
+    if not verification_queue.accepting():
+        await interaction.response.send_message(busy_message, ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    # Other members may have filled the queue while this one was deferred
+    if not verification_queue.submit(run_queued_verification, handler, interaction, *args):
+        await interaction.followup.send(busy_message, ephemeral=True)
 
-# Utility functions
-def load_attempts_log():
-    if os.path.exists(attempts_log) and os.stat(attempts_log).st_size > 0:
-        try:
-            with open(attempts_log, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {}
-    return {}
-
-def save_attempts_log(failed_attempts):
-    with open(attempts_log, 'w') as f:
-        json.dump(failed_attempts, f, indent=4)
-
-def load_verification_log():
-    if os.path.exists(verification_log) and os.stat(verification_log).st_size > 0:
-        try:
-            with open(verification_log, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return []
-    return []
-
-def save_verification_log(log_entry):
-    logs = load_verification_log()
-    logs.append(log_entry)
-    with open(verification_log, 'w') as f:
-        json.dump(logs, f, indent=4)
-
-def load_welcome_log():
-    if os.path.exists(welcome_log) and os.stat(welcome_log).st_size > 0:
-        try:
-            with open(welcome_log, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {}
-    return {}
-
-def save_welcome_log(welcome_messages):
-    with open(welcome_log, 'w') as f:
-        json.dump(welcome_messages, f, indent=4)
-
-def load_username_log():
-    if os.path.exists(username_log) and os.stat(username_log).st_size > 0:
+async def run_queued_verification(handler, interaction, *args):
+    try:
+        await handler(interaction, *args)
+    except Exception:
+        # Replace the "thinking..." state instead of leaving it hanging
         try:
-            with open(username_log, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return []
-    return []
-
-def save_username_log(log_entry):
-    logs = load_username_log()
-    logs.append(log_entry)
-    with open(username_log, 'w') as f:
-        json.dump(logs, f, indent=4)
-
-def log_username_update(member, email, oldname, newname):
+            await interaction.followup.send(
+                "Something went wrong while verifying. Please try again or contact a moderator.",
+                ephemeral=True
+            )
+        except discord.HTTPException:
+            pass
+        raise
+
+def interaction_expired(interaction):
+    # Followups stop working 15 minutes after the interaction was created
+    if interaction.is_expired():
+        print(f"Dropped verification for {interaction.user.name}: interaction expired while queued")
+        return True
+    return False
+
+# Utility functions
+async def log_username_update(member, email, oldname, newname):
     log_entry = {
         "discordusername": member.name,
         "discordid": member.id,
@@ -157,174 +132,212 @@ def log_username_update(member, email, oldname, newname):
         "newname": newname,
         "time": datetime.now(timezone.utc).isoformat() 
     }
-    save_username_log(log_entry)
+    await store.log_username_update(log_entry)
+
+async def apply_member_update(member, roles_to_assign, auto_assigned_role, new_nickname):
+    """Give ``member`` the program roles, drop the auto-assigned role and set
+    ``new_nickname`` (None keeps the nickname) in a single member edit.
+
+    Returns True if the nickname was changed.
+    """
+    roles = [role for role in member.roles if not role.is_default() and role != auto_assigned_role]
+    roles += [role for role in roles_to_assign if role not in roles]
+    if new_nickname is None:
+        await member.edit(roles=roles)
+        return False
+    try:
+        await member.edit(roles=roles, nick=new_nickname)
+        return True
+    except discord.Forbidden:
+        # A nickname the bot may not set (e.g. the member ranks above it) must not block the roles
+        print(f"Failed to change nickname for {member.name} due to missing permissions.")
+        await member.edit(roles=roles)
+        return False
+
+async def grant_verification(member, email, role_names):
+    """Give ``member`` the roles for ``role_names`` and the matching nickname
+    in one member edit, log the verification and drop their welcome message.
+
+    Returns ``(highest_role, new_nickname)``, where ``new_nickname`` is None
+    if the nickname was left alone, or None when none of the roles exist.
+    """
+    roles_to_assign = bot_data['roles'].roles_for(role_names)
+    if not roles_to_assign:
+        return None
+
+    # Highest priority role decides the nickname suffix
+    highest_role = nickname_formatter.highest_role(role_names)
+    new_nickname = nickname_formatter.format(member.display_name, highest_role, fallback=member.name)
+
+    # Roles, auto-assigned role removal and nickname in one request;
+    # the server owner's nickname cannot be changed
+    old_display_name = member.display_name
+    renamed = await apply_member_update(
+        member, roles_to_assign, bot_data['roles'].get('AUTO_ASSIGNED'),
+        new_nickname if member != member.guild.owner else None
+    )
+    if renamed:
+        print(f"Updated nickname for {old_display_name} to {new_nickname}")
+        await log_username_update(member, email, old_display_name, new_nickname)
+
+    await welcome_tracker.forget(member.id)
+
+    # Log successful verification
+    log_entry = {
+        "discordusername": member.name,
+        "discordid": member.id,
+        "email": email,
+        "roles": role_names,
+        "time": datetime.now(timezone.utc).isoformat()
+    }
+    await store.log_verification(log_entry)
+    await bot_data['email_claims'].claim(email, member.id, log_entry["time"])
+    # Remembered so a rejoin can be restored without verifying again
+    await bot_data['verified_members'].save(member.id, email, role_names,
+                                            new_nickname if renamed else member.nick, log_entry["time"])
+    return highest_role, new_nickname if renamed else None
+
+async def restore_verified_member(member):
+    """Give a rejoining verified member back their roles and nickname in one
+    member edit. Returns False when the member has to verify again."""
+    record = bot_data['verified_members'].get(member.id)
+    if record is None:
+        return False
+    # The email may have been claimed by another account while they were away
+    allowed, other_ids = bot_data['email_claims'].check(record['email'] or '', member.id, member.guild)
+    if not allowed:
+        print(f"Not restoring {member.name}: {record['email']} is claimed by {other_ids}")
+        return False
+    # Only restore roles the email still holds in the current roster
+    role_names = get_roles_for_email(record['email'] or '', bot_data['excel_data'], bot_data.get('roster_filter'))
+    roles = bot_data['roles'].roles_for(role_names)
+    if not roles:
+        return False
+    nickname = record['nickname']
+    if nickname is None:
+        highest_role = nickname_formatter.highest_role(role_names)
+        nickname = nickname_formatter.format(member.display_name, highest_role, fallback=member.name)
+    try:
+        await apply_member_update(member, roles, bot_data['roles'].get('AUTO_ASSIGNED'), nickname)
+    except discord.HTTPException as e:
+        print(f"Could not restore roles for {member.name}, asking them to verify again: {e}")
+        return False
+    print(f"Restored {', '.join(role_names)} for returning member {member.name}")
+    return True
+
+async def report_shared_email(member, email, other_ids, allowed):
+    """Tell the log channel that ``member`` used an email other accounts verified with."""
+    log_channel = bot.get_channel(int(os.getenv('LOG_CHANNEL_ID', 0)))
+    if not log_channel:
+        return
+    embed = discord.Embed(
+        title="Shared Verification Email" if allowed else "Verification Refused: Email Already Claimed",
+        description=f"{member.mention} (`{member.id}`) verified with `{email}`" if allowed
+                    else f"{member.mention} (`{member.id}`) tried to verify with `{email}`",
+        color=discord.Color.orange() if allowed else discord.Color.red(),
+        timestamp=discord.utils.utcnow()
+    )
+    embed.add_field(
+        name="Already claimed by",
+        value="\n".join(f"<@{other_id}> (`{other_id}`)" + ("" if member.guild.get_member(other_id) else " - left")
+                        for other_id in other_ids[:10]),
+        inline=False
+    )
+    embed.add_field(name="Policy", value=bot_data['email_claims'].policy, inline=True)
+    try:
+        await log_channel.send(embed=embed)
+    except discord.HTTPException as e:
+        print(f"Could not report shared email for {member.name}: {e}")
 
 # Event handlers for member join (will be registered in the bot.py file)
 async def on_member_join(member):
-    role = discord.utils.get(member.guild.roles, id=bot_data['role_ids']['AUTO_ASSIGNED'])
+    role = bot_data['roles'].get('AUTO_ASSIGNED')
     if role:
         await member.add_roles(role)
         print(f"Assigned unverified role to {member.name}")
 
         welcome_channel = bot.get_channel(int(os.getenv('WELCOME_CHANNEL_ID')))
         if welcome_channel:
-            welcome_message = await welcome_channel.send(
-                f"Welcome to the server, {member.mention}! To get access to GSSoC, please verify your selection by using the command `/verify registered-email-id`"
-            )
-            
-            welcome_messages = bot_data.get('welcome_messages', {})
-            welcome_messages[member.id] = {
-                "message_id": welcome_message.id,
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            }
-            bot_data['welcome_messages'] = welcome_messages
-            save_welcome_log(welcome_messages)
+            # Joins close together share one welcome message
+            await welcome_dispatcher.welcome(welcome_channel, member)
         else:
             print(f"Failed to find the welcome channel {int(os.getenv('WELCOME_CHANNEL_ID'))}")
 
 # Command implementations
 async def verify_user(interaction: discord.Interaction, email: str):
     member = interaction.user
-    auto_assigned_role = discord.utils.get(member.guild.roles, id=bot_data['role_ids']['AUTO_ASSIGNED'])
 
     if interaction.channel.id != verification_channel_id:
         await interaction.response.send_message(f"This command can only be used in <#{verification_channel_id}>.", ephemeral=True)
         return
 
-    role_names = get_roles_for_email(email, bot_data['excel_data'])
+    role_names = get_roles_for_email(email, bot_data['excel_data'], bot_data.get('roster_filter'))
 
     if not role_names:
-        await interaction.response.send_message("This email is not in our records. Contact a moderator in case of any errors.", ephemeral=True)
-        failed_attempts = load_attempts_log()
-        failed_attempts[str(member.id)] = email
-        save_attempts_log(failed_attempts)
-        return
-
-    # Get roles to assign
-    roles_to_assign = []
-    for name in role_names:
-        role_id = bot_data['role_ids'].get(name)
-        if role_id:
-            role = discord.utils.get(interaction.guild.roles, id=role_id)
-            if role:
-                roles_to_assign.append(role)
-
-    if roles_to_assign:
-        await member.add_roles(*roles_to_assign)
-        role_names_str = ", ".join(role_names)
-        
-        # Find highest priority role
-        highest_role = None
-        for role in bot_data['constants']['ROLE_PRIORITY']:
-            if role in role_names:
-                highest_role = role
-                break
-
-        # Remove auto assigned role if present
-        if auto_assigned_role in member.roles:
-            await member.remove_roles(auto_assigned_role)
-            print(f"Removed auto-assigned role from {member.name}")
-
-        # Format the display name
-        display_name = member.display_name
-        
-        # Remove existing roles from the display name
-        for role in bot_data['constants']['ROLE_PRIORITY'] + bot_data['constants']['ROLE_PRIORITY_LOWER']:
-            # Check for " | ROLE" pattern
-            pattern_1 = f" | {role}"
-            pattern_2 = f"|{role}"
-
-            if pattern_1 in display_name:
-                display_name = display_name.replace(pattern_1, "").strip()
-            elif pattern_2 in display_name:
-                display_name = display_name.replace(pattern_2, "").strip()
-            
-            # Check for standalone role
-            if role in display_name.split(" "):
-                display_name = display_name.replace(role, "").strip()
-
-        # Create new nickname with appropriate formatting
-        new_nickname = f"{display_name} | {highest_role}"
-        if len(new_nickname) > 32:
-            excess_length = len(new_nickname) - 32
-            truncated_display_name = display_name[:-excess_length]
-            display_name = truncated_display_name
-
-            if highest_role == "Campus Ambassador":
-                new_nickname = f"{display_name} | CA"
-            elif highest_role == "CA | Wob":
-                new_nickname = f"{display_name} | CA | WoB"
-            elif highest_role == "Contributor | Wob":
-                new_nickname = f"{display_name} | Contri | WoB"
-            elif highest_role == "Mentor | Wob":
-                new_nickname = f"{display_name} | Mentor | WoB"
-            elif highest_role == "PA | Wob":
-                new_nickname = f"{display_name} | PA | WoB"
-            else:
-                excess_length = len(new_nickname) - 32
-                truncated_display_name = display_name[:-excess_length]
-                new_nickname = f"{truncated_display_name} | {highest_role}"
-
-        # Send appropriate welcome message
-        if "Wob" in new_nickname or "WoB" in new_nickname:
+        suggestions = suggest_emails(email, bot_data.get('roster_suggestions'))
+        if suggestions:
             await interaction.response.send_message(
-                f":tada: Congratulations! {member.mention} :tada:, you're selected as `{role_names_str}` for Winter Of Blockchain 2024.", 
+                f"This email is not in our records, but a close match exists: `{mask_email(suggestions[0])}`. "
+                "Please check for typos and run `/verify` again with the exact email you registered with.",
                 ephemeral=True
             )
         else:
-            await interaction.response.send_message(
-                f":tada: Congratulations! {member.mention} :tada:, you're selected as `{role_names_str}` for GSSoC'24 Extended.", 
-                ephemeral=True
-            )
+            await interaction.response.send_message("This email is not in our records. Contact a moderator in case of any errors.", ephemeral=True)
+        await store.record_failed_attempt(member.id, email)
+        return
 
-        # Update nickname if not the server owner
-        if member != interaction.guild.owner:
-            try:
-                old_display_name = member.display_name
-                await member.edit(nick=new_nickname)
-                print(f"Updated nickname for {old_display_name} to {new_nickname}")
-                
-                # Log the username update
-                log_username_update(member, email, old_display_name, new_nickname)
-                
-                await interaction.followup.send(
-                    f"{member.mention} Your username has been updated to `{new_nickname}` as per Guidelines. "
-                    f"You are free to change it, but please ensure that **{highest_role}** remains part of your display name.",
-                    ephemeral=True
-                )
-            except discord.Forbidden:
-                print(f"Failed to change nickname for {member.name} due to missing permissions.")
-
-        # Delete welcome message if exists
-        welcome_messages = bot_data.get('welcome_messages', {})
-        if member.id in welcome_messages:
-            welcome_channel = bot.get_channel(int(os.getenv('WELCOME_CHANNEL_ID')))
-            if welcome_channel:
-                message_id = welcome_messages[member.id]["message_id"]
-                try:
-                    welcome_message = await welcome_channel.fetch_message(message_id)
-                    await welcome_message.delete()
-                    del welcome_messages[member.id]
-                    bot_data['welcome_messages'] = welcome_messages
-                    save_welcome_log(welcome_messages)
-                except discord.NotFound:
-                    print(f"Welcome message {message_id} not found.")
-
-        # Log successful verification
-        log_entry = {
-            "discordusername": member.name,
-            "discordid": member.id,
-            "email": email,
-            "roles": role_names,
-            "time": datetime.now(timezone.utc).isoformat()
-        }
-        save_verification_log(log_entry)
-
-    else:
-        await interaction.response.send_message(
+    await enqueue_verification(interaction, process_verification, email, role_names)
+
+async def process_verification(interaction: discord.Interaction, email: str, role_names):
+    if interaction_expired(interaction):
+        return
+    member = interaction.user
+
+    allowed, other_ids = bot_data['email_claims'].check(email, member.id, member.guild)
+    if not allowed:
+        await report_shared_email(member, email, other_ids, allowed)
+        await store.record_failed_attempt(member.id, email)
+        await interaction.followup.send(
+            "This email has already been used to verify another account. "
+            "Contact a moderator if you registered with it.",
+            ephemeral=True
+        )
+        return
+
+    # Reserve the email right after the check, with no await in between, so
+    # two accounts queued with the same email cannot both pass. The grant
+    # claims it for good; if it fails the reservation is given up
+    bot_data['email_claims'].reserve(email, member.id)
+    try:
+        granted = await grant_verification(member, email, role_names)
+    finally:
+        bot_data['email_claims'].release(email, member.id)
+    if granted is None:
+        await interaction.followup.send(
             f"Sorry, we couldn't verify your email at this time.", 
             ephemeral=True
         )
+        return
+    if other_ids:
+        await report_shared_email(member, email, other_ids, allowed)
+
+    highest_role, new_nickname = granted
+    role_names_str = ", ".join(role_names)
+    role_config = bot_data['programs']['roles'][highest_role]
+
+    # Send appropriate welcome message
+    program_title = bot_data['programs']['programs'][role_config['program']]['title']
+    await interaction.followup.send(
+        f":tada: Congratulations! {member.mention} :tada:, you're selected as `{role_names_str}` for {program_title}.", 
+        ephemeral=True
+    )
+
+    if new_nickname:
+        await interaction.followup.send(
+            f"{member.mention} Your username has been updated to `{new_nickname}` as per Guidelines. "
+            f"You are free to change it, but please ensure that **{highest_role}** remains part of your display name.",
+            ephemeral=True
+        )
 
 async def admin_verify_user(interaction: discord.Interaction, user: discord.Member, email: str):
     # Admin IDs from environment
@@ -338,110 +351,43 @@ async def admin_verify_user(interaction: discord.Interaction, user: discord.Memb
         )
         return
     
-    # Get auto-assigned role
-    auto_assigned_role = discord.utils.get(user.guild.roles, id=bot_data['role_ids']['AUTO_ASSIGNED'])
-    
     # Check email in records
-    role_names = get_roles_for_email(email, bot_data['excel_data'])
+    role_names = get_roles_for_email(email, bot_data['excel_data'], bot_data.get('roster_filter'))
     
     if not role_names:
+        suggestions = suggest_emails(email, bot_data.get('roster_suggestions'), limit=3)
+        closest = f" Closest roster matches: {', '.join(f'`{match}`' for match in suggestions)}" if suggestions else ""
         await interaction.response.send_message(
-            f"The email `{email}` is not in our records. Please contact a moderator.", 
+            f"The email `{email}` is not in our records. Please contact a moderator.{closest}", 
             ephemeral=True
         )
-        failed_attempts = load_attempts_log()
-        failed_attempts[str(user.id)] = email
-        save_attempts_log(failed_attempts)
+        await store.record_failed_attempt(user.id, email)
         return
-    
-    # Get roles to assign
-    roles_to_assign = []
-    for name in role_names:
-        role_id = bot_data['role_ids'].get(name)
-        if role_id:
-            role = discord.utils.get(interaction.guild.roles, id=role_id)
-            if role:
-                roles_to_assign.append(role)
-    
-    if roles_to_assign:
-        # Assign roles
-        await user.add_roles(*roles_to_assign)
-        role_names_str = ", ".join(role_names)
-        await interaction.response.send_message(
-            f":tada: {user.mention} has been successfully verified as `{role_names_str}`.", 
+
+    await enqueue_verification(interaction, process_admin_verification, user, email, role_names)
+
+async def process_admin_verification(interaction: discord.Interaction, user: discord.Member, email: str, role_names):
+    if interaction_expired(interaction):
+        return
+
+    granted = await grant_verification(user, email, role_names)
+    if granted is None:
+        await interaction.followup.send(
+            f"Sorry, we couldn't verify the email `{email}` at this time.", 
             ephemeral=True
         )
-        
-        # Remove auto-assigned role if present
-        if auto_assigned_role and auto_assigned_role in user.roles:
-            await user.remove_roles(auto_assigned_role)
-            print(f"Removed auto-assigned role from {user.name}")
-        
-        # Find highest priority role
-        highest_role = None
-        for role in bot_data['constants']['ROLE_PRIORITY']:
-            if role in role_names:
-                highest_role = role
-                break
-        
-        # Format nickname
-        display_name = user.display_name
-        
-        # Remove existing roles from display name
-        for role in bot_data['constants']['ROLE_PRIORITY'] + bot_data['constants']['ROLE_PRIORITY_LOWER']:
-            # Check for " | ROLE" pattern
-            pattern_1 = f" | {role}"
-            pattern_2 = f"|{role}"
-            
-            if pattern_1 in display_name:
-                display_name = display_name.replace(pattern_1, "").strip()
-            elif pattern_2 in display_name:
-                display_name = display_name.replace(pattern_2, "").strip()
-            
-            # Check for standalone role
-            if role in display_name.split(" "):
-                display_name = display_name.replace(role, "").strip()
-        
-        # Create new nickname
-        new_nickname = f"{display_name} | {highest_role}"
-        if len(new_nickname) > 32:
-            if highest_role == "Campus Ambassador":
-                new_nickname = f"{display_name} | CA"
-            else:
-                excess_length = len(new_nickname) - 32
-                truncated_display_name = display_name[:-excess_length]
-                new_nickname = f"{truncated_display_name} | {highest_role}"
-        
-        # Update nickname if not server owner
-        if user != interaction.guild.owner:
-            try:
-                old_display_name = user.display_name
-                await user.edit(nick=new_nickname)
-                print(f"Updated nickname for {old_display_name} to {new_nickname}")
-                
-                # Log username update
-                log_username_update(user, email, old_display_name, new_nickname)
-                
-                await interaction.followup.send(
-                    f"{user.mention} Your username has been updated to `{new_nickname}` as per GSSoC guidelines.",
-                    ephemeral=True
-                )
-            except discord.Forbidden:
-                print(f"Failed to change nickname for {user.name} due to missing permissions.")
-        
-        # Log successful verification
-        log_entry = {
-            "discordusername": user.name,
-            "discordid": user.id,
-            "email": email,
-            "roles": role_names,
-            "time": datetime.now(timezone.utc).isoformat()
-        }
-        save_verification_log(log_entry)
-    
-    else:
-        await interaction.response.send_message(
-            f"Sorry, we couldn't verify the email `{email}` at this time.", 
+        return
+
+    _, new_nickname = granted
+    role_names_str = ", ".join(role_names)
+    await interaction.followup.send(
+        f":tada: {user.mention} has been successfully verified as `{role_names_str}`.", 
+        ephemeral=True
+    )
+
+    if new_nickname:
+        await interaction.followup.send(
+            f"{user.mention} Your username has been updated to `{new_nickname}` as per GSSoC guidelines.",
             ephemeral=True
         )
 
@@ -457,42 +403,16 @@ async def cache_unverified_members(interaction: discord.Interaction):
         )
         return
     
-    bot_data['cached_unverified_members'] = []
-    
-    try:
-        # Find members with few roles
-        for member in interaction.guild.members:
-            if len(member.roles) <= 2:  # Default role + possibly one more
-                bot_data['cached_unverified_members'].append(member)
-        
+    # Kept current from member events, so this is a lookup rather than a scan
+    unverified = bot_data['unverified']
+    if not unverified.seeded:
         await interaction.response.send_message(
-            f"Successfully cached {len(bot_data['cached_unverified_members'])} unverified member(s).", 
-            ephemeral=False
-        )
-    except Exception as e:
-        print(e)
-        await interaction.response.send_message(
-            f"An error occurred: {e}", 
+            "The unverified member list is still being built, please try again shortly.",
             ephemeral=False
         )
+        return
 
-@tasks.loop(minutes=30)
-async def cleanup_welcome_messages():
-    now = datetime.now(timezone.utc)
-    welcome_messages = bot_data.get('welcome_messages', {})
-    stale_messages = {member_id: data for member_id, data in welcome_messages.items()
-                     if now - datetime.fromisoformat(data["timestamp"]) > timedelta(hours=1)}
-    
-    welcome_channel = bot.get_channel(int(os.getenv('WELCOME_CHANNEL_ID')))
-    if welcome_channel:
-        for member_id, data in stale_messages.items():
-            try:
-                message_id = data["message_id"]
-                message = await welcome_channel.fetch_message(message_id)
-                await message.delete()
-                del welcome_messages[member_id]
-            except discord.NotFound:
-                print(f"Message {message_id} not found.")
-        
-        bot_data['welcome_messages'] = welcome_messages
-        save_welcome_log(welcome_messages)
+    await interaction.response.send_message(
+        f"Successfully cached {len(unverified)} unverified member(s).",
+        ephemeral=False
+    )
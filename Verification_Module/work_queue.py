@@ -0,0 +1,172 @@
+import asyncio
+import contextvars
+import logging
+import os
+import re
+import time
+import traceback
+from collections import deque
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Verifications processed concurrently, and how many may wait before
+# /verify starts turning people away
+VERIFY_WORKERS = int(os.getenv('VERIFY_WORKERS', '4'))
+VERIFY_QUEUE_SIZE = int(os.getenv('VERIFY_QUEUE_SIZE', '1000'))
+
+# Routes a verification calls; a 429 on any of them pauses the workers
+VERIFY_ROUTES = ('/members/',)
+
+# Recent jobs kept for the wait time and throughput figures
+STATS_WINDOW = 500
+
+# REST calls made by the job running in the current worker
+_job_rest_calls = contextvars.ContextVar('job_rest_calls', default=None)
+
+_api_prefix = re.compile(r'^.*/api/v\d+')
+_snowflake = re.compile(r'\d{15,20}')
+
+class RateLimitMonitor(logging.Handler):
+    """Counts the 429s discord.py logs, per route, and remembers until when
+    each route is blocked.
+
+    discord.py already retries rate-limited requests; this only lets the
+    workers stop starting new jobs on a blocked route instead of piling
+    more requests into the same bucket.
+    """
+
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.hits = {}
+        self.blocked_until = {}
+        self.global_until = 0.0
+
+    def emit(self, record):
+        message = record.msg if isinstance(record.msg, str) else ''
+        if message.startswith('Global rate limit'):
+            self.global_until = time.monotonic() + float(record.args[0])
+        elif message.startswith('We are being rate limited') and len(record.args) >= 3:
+            method, url, retry_after = record.args[:3]
+            route = f"{method} {_snowflake.sub('{id}', _api_prefix.sub('', str(url)))}"
+            self.hits[route] = self.hits.get(route, 0) + 1
+            self.blocked_until[route] = time.monotonic() + float(retry_after)
+
+    def retry_after(self, markers=VERIFY_ROUTES):
+        """Seconds until every route containing one of ``markers`` is clear."""
+        until = max([self.global_until] + [blocked for route, blocked in self.blocked_until.items()
+                                           if any(marker in route for marker in markers)])
+        return max(0.0, until - time.monotonic())
+
+def count_rest_calls(http):
+    """Wrap ``http.request`` so requests made by a queued job are counted."""
+    if getattr(http.request, 'counts_rest_calls', False):
+        return
+    request = http.request
+
+    async def counted_request(route, **kwargs):
+        calls = _job_rest_calls.get()
+        if calls is not None:
+            calls.append(f"{route.method} {route.path}")
+        return await request(route, **kwargs)
+
+    counted_request.counts_rest_calls = True
+    http.request = counted_request
+
+class VerificationQueue:
+    """Bounded queue of verification jobs drained by a fixed pool of workers.
+
+    ``submit`` never waits: when the queue is full it returns False and the
+    caller tells the member to retry, so a surge cannot grow memory or
+    stall interactions without bound.
+    """
+
+    def __init__(self, workers=VERIFY_WORKERS, maxsize=VERIFY_QUEUE_SIZE):
+        self.workers = workers
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.rate_limits = RateLimitMonitor()
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy = 0
+        self.wait_times = deque(maxlen=STATS_WINDOW)
+        self.finished_at = deque(maxlen=STATS_WINDOW)
+        # (all REST calls, member route calls) per finished job
+        self.rest_calls = deque(maxlen=STATS_WINDOW)
+        self._tasks = []
+
+    @property
+    def running(self):
+        return any(not task.done() for task in self._tasks)
+
+    def start(self, http=None):
+        logging.getLogger('discord.http').addHandler(self.rate_limits)
+        if http is not None:
+            count_rest_calls(http)
+        self._tasks = [asyncio.get_running_loop().create_task(self._worker()) for _ in range(self.workers)]
+
+    def accepting(self):
+        """False, counted as a rejection, when a new job would not fit."""
+        if self.queue.full():
+            self.rejected += 1
+            return False
+        return True
+
+    def submit(self, handler, *args):
+        """Queue ``handler(*args)``; returns False if the queue is full."""
+        try:
+            self.queue.put_nowait((time.monotonic(), handler, args))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.submitted += 1
+        return True
+
+    async def _worker(self):
+        while True:
+            enqueued, handler, args = await self.queue.get()
+            try:
+                # Back off while Discord is rate limiting the member routes
+                delay = self.rate_limits.retry_after()
+                if delay:
+                    await asyncio.sleep(delay)
+                self.wait_times.append(time.monotonic() - enqueued)
+                self.busy += 1
+                calls = []
+                token = _job_rest_calls.set(calls)
+                try:
+                    await handler(*args)
+                    self.completed += 1
+                except Exception:
+                    self.failed += 1
+                    traceback.print_exc()
+                finally:
+                    _job_rest_calls.reset(token)
+                    self.busy -= 1
+                    self.finished_at.append(time.monotonic())
+                    self.rest_calls.append((len(calls), sum(1 for route in calls if '/members/' in route)))
+            finally:
+                self.queue.task_done()
+
+    def stats(self):
+        waits = sorted(self.wait_times)
+        now = time.monotonic()
+        return {
+            'depth': self.queue.qsize(),
+            'capacity': self.queue.maxsize,
+            'workers': self.workers,
+            'busy': self.busy,
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+            'completed': self.completed,
+            'failed': self.failed,
+            'wait_p50': waits[len(waits) // 2] if waits else 0.0,
+            'wait_p95': waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+            'per_minute': sum(1 for finished in self.finished_at if now - finished <= 60),
+            'rate_limited': dict(self.rate_limits.hits),
+            'rest_per_job': sum(total for total, _ in self.rest_calls) / len(self.rest_calls) if self.rest_calls else 0.0,
+            'member_rest_per_job': sum(member for _, member in self.rest_calls) / len(self.rest_calls) if self.rest_calls else 0.0,
+        }
+
+verification_queue = VerificationQueue()
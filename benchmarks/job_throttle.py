@@ -0,0 +1,77 @@
+# Benchmark: a bulk job that hits 429s near its end, with the throttle
+# taking workers away, must still finish every item; and a job cancelled
+# while throttled must stop after the items in flight
+# Run from the repository root: python benchmarks/job_throttle.py [items]
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+directory = tempfile.mkdtemp()
+os.environ['STATE_DB'] = os.path.join(directory, 'bot_state.db')
+
+import job_engine
+from job_engine import JobKind, register_kind
+from state_store import store
+from Verification_Module.work_queue import verification_queue
+
+ROUTE = 'PATCH /guilds/{id}/members/{id}'
+CONCURRENCY = 4
+TIMEOUT = 30
+
+class FakeBot:
+    def get_guild(self, guild_id):
+        return object()
+
+    def get_channel(self, channel_id):
+        return None
+
+def make_handler(rate_limited):
+    async def handler(guild, bot_data, job, item):
+        await asyncio.sleep(0.01)
+        if item['item'] in rate_limited:
+            # What the RateLimitMonitor records when discord.py logs a 429
+            hits = verification_queue.rate_limits.hits
+            hits[ROUTE] = hits.get(ROUTE, 0) + 1
+        return 'done', ''
+    return handler
+
+async def run(name, items, rate_limited, cancel_after=None):
+    register_kind(JobKind(name, name, make_handler(rate_limited), {'done': "Done"}, concurrency=CONCURRENCY))
+    job_id = await store.create_job(name, 1, 1, 1, [(i, {}, None, '') for i in range(items)], '')
+    job = await store.get_job(job_id)
+    job_engine.start_job(FakeBot(), {}, job)
+    if cancel_after is not None:
+        await asyncio.sleep(cancel_after)
+        await job_engine.cancel_job(job_id)
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(asyncio.shield(job_engine._running[job_id]), TIMEOUT)
+        hung = False
+    except asyncio.TimeoutError:
+        job_engine._running[job_id].cancel()
+        hung = True
+    counts = await store.job_result_counts(job_id)
+    state = (await store.get_job(job_id))['state']
+    return hung, counts, state, time.perf_counter() - start
+
+async def main():
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    # 429s on the last few items, too late for the throttle to ramp back up
+    late = set(range(items - 6, items - 2))
+    hung, counts, state, elapsed = await run('late429', items, late)
+    print(f"{items} items, 429s on items {sorted(late)}:")
+    print(f"  {'HUNG' if hung else state} after {elapsed:.1f}s, results {counts}")
+
+    # Throttled down to one worker, then cancelled
+    hung, counts, state, elapsed = await run('cancel429', items * 50, set(range(CONCURRENCY)), cancel_after=0.5)
+    print(f"{items * 50} items, 429s on the first {CONCURRENCY}, cancelled after 0.5s:")
+    print(f"  {'HUNG' if hung else state} {elapsed:.1f}s after cancelling, results {counts}")
+    store.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+# Benchmark: one verification log write with 100k entries already logged,
+# rewriting the whole JSON array vs. appending a JSONL line vs. a SQLite
+# insert through the state store, committed per write or write-behind
+# Run from the repository root: python benchmarks/log_writes.py [entries]
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jsonl_log import append_jsonl
+from state_store import StateStore
+
+WRITES = 20
+
+def make_entry(i):
+    return {
+        "discordusername": f"user{i}",
+        "discordid": 1000000000000000000 + i,
+        "email": f"user{i}@example.com",
+        "roles": ["Contributor"],
+        "time": datetime.now(timezone.utc).isoformat()
+    }
+
+def old_save_verification_log(path, log_entry):
+    # The previous save_verification_log: load everything, append, rewrite
+    with open(path, 'r') as f:
+        logs = json.load(f)
+    logs.append(log_entry)
+    with open(path, 'w') as f:
+        json.dump(logs, f, indent=4)
+
+def time_writes(write, path, start_id):
+    latencies = []
+    for i in range(WRITES):
+        start = time.perf_counter()
+        write(path, make_entry(start_id + i))
+        latencies.append(time.perf_counter() - start)
+    return sum(latencies) / len(latencies)
+
+async def time_store_writes(store, start_id, commit_each):
+    latencies = []
+    for i in range(WRITES):
+        start = time.perf_counter()
+        await store.log_verification(make_entry(start_id + i))
+        if commit_each:
+            await store.flush()
+        latencies.append(time.perf_counter() - start)
+    return sum(latencies) / len(latencies)
+
+async def fill_store(store, existing):
+    for entry in existing:
+        await store.log_verification(entry)
+    await store.flush()
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    existing = [make_entry(i) for i in range(entries)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, 'verification_loga.json')
+        with open(json_path, 'w') as f:
+            json.dump(existing, f, indent=4)
+
+        jsonl_path = os.path.join(directory, 'verification_log.jsonl')
+        with open(jsonl_path, 'w') as f:
+            f.writelines(json.dumps(entry) + '\n' for entry in existing)
+
+        rewrite = time_writes(old_save_verification_log, json_path, entries)
+        append = time_writes(append_jsonl, jsonl_path, entries)
+
+        store = StateStore(os.path.join(directory, 'bot_state.db'))
+        asyncio.run(fill_store(store, existing))
+        commits_before = store.flushes
+        insert = asyncio.run(time_store_writes(store, entries, commit_each=True))
+        buffered = asyncio.run(time_store_writes(store, entries + WRITES, commit_each=False))
+        asyncio.run(store.flush())
+        commits = store.flushes - commits_before
+        store.close()
+
+    print(f"Write latency with {entries} entries already logged:")
+    print(f"  rewrite JSON array   {rewrite * 1000:>10.2f}ms")
+    print(f"  append JSONL line    {append * 1000:>10.3f}ms  ({rewrite / append:.0f}x faster)")
+    print(f"  SQLite commit/write  {insert * 1000:>10.3f}ms  ({rewrite / insert:.0f}x faster)")
+    print(f"  SQLite write-behind  {buffered * 1000:>10.3f}ms  ({rewrite / buffered:.0f}x faster)")
+    print(f"  SQLite commits for {2 * WRITES} writes: {commits} ({WRITES} committed each, {WRITES} buffered)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# Benchmark: nickname formatting per verification, the old per-token
+# str.replace loop vs. the compiled nickname formatter. Also checks the
+# formatter's properties over a corpus of real-world style display names.
+# Run from the repository root: python benchmarks/nickname_format.py [names]
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nickname import NICKNAME_LIMIT, nickname_formatter
+from programs import PROGRAM_TABLE
+
+# Display names as they show up in the server: plain, with old role
+# suffixes, pipes without spaces, role words on their own, emoji, non-Latin
+# scripts and names already at or over the limit
+CORPUS = [
+    "Priya", "priya_sharma", "Aarav Mehta", "Rahul | Contributor", "Rahul|Contributor",
+    "Sneha | CA", "Sneha | Campus Ambassador", "CA Sneha", "Ankit | PA | WoB", "Ankit | Project Admin",
+    "Mentor Ravi", "Ravi | mentor", "ravi | Mentor | WoB", "Dev | Contri | WoB", "Dev | contri",
+    "Contributor", "CA", "| Contributor", "Kiran ||", "Kiran | Contributors",
+    "Pallavi Papa", "pa", "Capa", "Anjali | Contributor 2024", "Meera | Mentor | Contributor",
+    "🌸 Ishita 🌸", "🚀 Arjun | Contributor", "Ｈｉｍａｎｓｈｕ", "Лена", "李明 | Mentor",
+    "محمد | CA", "Srinivasaraghavan Venkataramanan", "Venkata Subrahmanya Sai Krishna",
+    "Aditya Narayan Singh Chauhan | CA", "x" * 32, "y" * 40 + " | Contributor",
+    "Nikhil  |  Contributor", " Tanvi ", "Tanvi\t| PA", "GSSoC'24 | Contributor",
+]
+
+def old_format(display_name, role_name):
+    # The per-command loop this replaced (verify_user's truncation rule)
+    for role in PROGRAM_TABLE['nickname_tokens']:
+        pattern_1 = f" | {role}"
+        pattern_2 = f"|{role}"
+        if pattern_1 in display_name:
+            display_name = display_name.replace(pattern_1, "").strip()
+        elif pattern_2 in display_name:
+            display_name = display_name.replace(pattern_2, "").strip()
+        if role in display_name.split(" "):
+            display_name = display_name.replace(role, "").strip()
+    role_config = PROGRAM_TABLE['roles'][role_name]
+    new_nickname = f"{display_name} | {role_config['nickname']}"
+    if len(new_nickname) > 32:
+        excess_length = len(new_nickname) - 32
+        display_name = display_name[:-excess_length]
+        new_nickname = f"{display_name} | {role_config['short_nickname'] or role_config['nickname']}"
+    return new_nickname
+
+def make_names(count):
+    roles = list(PROGRAM_TABLE['roles'])
+    tokens = PROGRAM_TABLE['nickname_tokens']
+    names = []
+    for _ in range(count):
+        name = random.choice(CORPUS)
+        if random.random() < 0.5:
+            name = f"{name}{random.choice([' | ', '|', ' '])}{random.choice(tokens)}"
+        names.append((name, random.choice(roles)))
+    return names
+
+def check_properties(names):
+    """Return the (name, role, nickname, problem) cases breaking a property."""
+    failures = []
+    for name, role_name in names:
+        nickname = nickname_formatter.format(name, role_name, fallback="member")
+        suffixes = [PROGRAM_TABLE['roles'][role_name]['nickname'], PROGRAM_TABLE['roles'][role_name]['short_nickname']]
+        if len(nickname) > NICKNAME_LIMIT:
+            failures.append((name, role_name, nickname, "longer than the limit"))
+        if not any(suffix and nickname.endswith(suffix) for suffix in suffixes):
+            failures.append((name, role_name, nickname, "missing the role suffix"))
+        if nickname_formatter.format(nickname, role_name, fallback="member") != nickname:
+            failures.append((name, role_name, nickname, "not stable when applied again"))
+        if nickname_formatter.strip_roles(nickname_formatter.strip_roles(name)) != nickname_formatter.strip_roles(name):
+            failures.append((name, role_name, nickname, "stripping is not idempotent"))
+    return failures
+
+def time_calls(format_nickname, names):
+    start = time.perf_counter()
+    for name, role_name in names:
+        format_nickname(name, role_name)
+    return (time.perf_counter() - start) / len(names)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    random.seed(0)
+    names = make_names(count)
+
+    failures = check_properties([(name, role_name) for name in CORPUS for role_name in PROGRAM_TABLE['roles']] + names)
+    old_too_long = sum(1 for name, role_name in names if len(old_format(name, role_name)) > NICKNAME_LIMIT)
+
+    old = time_calls(old_format, names)
+    new = time_calls(nickname_formatter.format, names)
+
+    print(f"Nickname formatting over {count} display names:")
+    print(f"  per-token replace loop  {old * 1e6:>8.2f}us  ({old_too_long} results over {NICKNAME_LIMIT} characters)")
+    print(f"  compiled formatter      {new * 1e6:>8.2f}us  ({old / new:.1f}x faster)")
+    print(f"Property violations: {len(failures)}")
+    for name, role_name, nickname, problem in failures[:10]:
+        print(f"  {name!r} as {role_name}: {nickname!r} is {problem}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Benchmark: parsing the same roster exported as xlsx, CSV, Parquet and JSONL
+# Run from the repository root: python benchmarks/roster_formats.py [rows]
+# Needs pandas and pyarrow to write the exports.
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_handler import read_sheet_emails
+
+def export(frame, path):
+    extension = os.path.splitext(path)[1]
+    if extension == '.xlsx':
+        frame.to_excel(path, index=False)
+    elif extension == '.csv':
+        frame.to_csv(path, index=False)
+    elif extension == '.parquet':
+        frame.to_parquet(path, index=False)
+    elif extension == '.jsonl':
+        frame.to_json(path, orient='records', lines=True)
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    frame = pd.DataFrame({
+        'name': [f"User {i}" for i in range(rows)],
+        'email': [f"User.{i}@Example.com" for i in range(rows)],
+        'college': [f"College {i % 997}" for i in range(rows)],
+    })
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'format':<10} {'size':>10} {'parse':>10} {'rows/s':>12}")
+        baseline = None
+        for extension in ('.xlsx', '.csv', '.parquet', '.jsonl'):
+            path = os.path.join(directory, f"contributor_Data{extension}")
+            export(frame, path)
+
+            start = time.perf_counter()
+            emails = read_sheet_emails(path)
+            elapsed = time.perf_counter() - start
+
+            baseline = baseline or emails
+            assert emails == baseline
+            print(f"{extension[1:]:<10} {os.path.getsize(path) / 1024 / 1024:>8.1f}MB "
+                  f"{elapsed:>9.2f}s {len(emails) / elapsed:>12,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Benchmark: linear per-role scan vs. the compiled email index
+# Run from the repository root: python benchmarks/roster_lookup.py
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_handler import ROLE_NAMES, build_roster_index, get_roles_for_email
+
+ROSTER_SIZES = [10_000, 100_000, 1_000_000]
+QUERIES = 200
+
+def make_roster(total_rows):
+    # Contributors dominate real rosters, the other roles are a few percent each
+    weights = [3, 1, 80, 10, 2, 1, 2, 1]
+    data = {}
+    for role_name, weight in zip(ROLE_NAMES, weights):
+        rows = max(1, total_rows * weight // sum(weights))
+        data[role_name] = np.array(
+            [f"{role_name[:2].lower()}{i}@example.com" for i in range(rows)], dtype=object
+        )
+    return data
+
+def old_get_roles_for_email(email, excel_data):
+    email = email.lower()
+    roles = []
+    for role_name, emails in excel_data.items():
+        if email in emails:
+            roles.append(role_name)
+    return roles
+
+def time_lookups(lookup, emails, data):
+    start = time.perf_counter()
+    for email in emails:
+        lookup(email, data)
+    return (time.perf_counter() - start) / len(emails)
+
+def main():
+    random.seed(0)
+    print(f"{'rows':>10} {'linear scan':>14} {'index':>12} {'speedup':>10} {'build':>10}")
+    for total_rows in ROSTER_SIZES:
+        data = make_roster(total_rows)
+        all_emails = [email for emails in data.values() for email in emails]
+        # Half hits, half misses, like a real verification channel
+        queries = random.sample(all_emails, QUERIES // 2)
+        queries += [f"nobody{i}@example.com" for i in range(QUERIES // 2)]
+
+        start = time.perf_counter()
+        index = build_roster_index(data)
+        build_time = time.perf_counter() - start
+
+        for email in queries:
+            assert sorted(old_get_roles_for_email(email, data)) == sorted(get_roles_for_email(email, index))
+
+        old = time_lookups(old_get_roles_for_email, queries, data)
+        new = time_lookups(get_roles_for_email, queries, index)
+        print(f"{total_rows:>10} {old * 1e6:>12.1f}us {new * 1e6:>10.2f}us {old / new:>9.0f}x {build_time:>9.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# Benchmark: roster load at startup with and without the compiled snapshot,
+# and the email filter and suggestion index built vs. read from their cache
+# Run from the repository root: python benchmarks/roster_startup.py [total_rows]
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_handler import SHEETS, load_excel_data, load_lookups
+
+def make_sheets(directory, total_rows):
+    # Contributors dominate real rosters, the other sheets are a few percent each
+    sheets = []
+    for position, (role_name, path) in enumerate(SHEETS):
+        rows = total_rows * 80 // 100 if role_name == 'Contributor' else max(1, total_rows * 2 // 100)
+        sheet_path = os.path.join(directory, os.path.basename(path))
+        pd.DataFrame({
+            'name': [f"User {i}" for i in range(rows)],
+            'email': [f"Sheet{position}.User{i}@Example.com" for i in range(rows)],
+        }).to_excel(sheet_path, index=False)
+        sheets.append((role_name, sheet_path))
+    return sheets
+
+def timed(label, **kwargs):
+    start = time.perf_counter()
+    index = load_excel_data(**kwargs)
+    print(f"{label:<32} {time.perf_counter() - start:>8.3f}s  ({len(index)} emails)")
+    return index
+
+def print_sheet_stats(sheet_stats):
+    for path, stats in sorted(sheet_stats.items(), key=lambda item: item[1]['seconds'], reverse=True):
+        print(f"    {os.path.basename(path):<28} {stats['seconds']:>8.3f}s {stats['rows']:>8} rows "
+              f"{stats['peak_bytes'] / 1024 / 1024:>8.1f} MiB peak")
+
+def main():
+    total_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Generating {len(SHEETS)} sheets with ~{total_rows} rows...")
+        sheets = make_sheets(directory, total_rows)
+        snapshot_path = os.path.join(directory, 'roster.snapshot')
+
+        baseline = timed("openpyxl, sequential", sheets=sheets, snapshot_path=None, workers=1)
+        assert timed("openpyxl, process pool", sheets=sheets, snapshot_path=None) == baseline
+        sheet_stats = {}
+        timed("openpyxl, tracing memory", sheets=sheets, snapshot_path=None, sheet_stats=sheet_stats,
+              trace_memory=True)
+        print_sheet_stats(sheet_stats)
+        print(f"    email column alone: {sum(len(email) + 1 for email in baseline) / 1024 / 1024:.1f} MiB")
+        timed("openpyxl, writing snapshot", sheets=sheets, snapshot_path=snapshot_path)
+        assert timed("snapshot, nothing changed", sheets=sheets, snapshot_path=snapshot_path) == baseline
+
+        # Touch one sheet without editing it, then edit a small one
+        os.utime(sheets[0][1])
+        timed("snapshot, one sheet touched", sheets=sheets, snapshot_path=snapshot_path)
+        pd.DataFrame({'name': ['Late'], 'email': ['late@example.com']}).to_excel(sheets[-1][1], index=False)
+        timed("snapshot, one sheet edited", sheets=sheets, snapshot_path=snapshot_path)
+        print(f"Snapshot size: {os.path.getsize(snapshot_path) / 1024:.0f} KiB")
+
+        index = load_excel_data(sheets=sheets, snapshot_path=snapshot_path)
+        lookups_path = os.path.join(directory, 'roster.snapshot.lookups')
+        for label in ("lookups, built and cached", "lookups, from the cache"):
+            start = time.perf_counter()
+            load_lookups(index, lookups_path)
+            print(f"{label:<32} {time.perf_counter() - start:>8.3f}s")
+        print(f"Lookups cache size: {os.path.getsize(lookups_path) / 1024:.0f} KiB")
+
+if __name__ == "__main__":
+    main()
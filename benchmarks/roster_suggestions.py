@@ -0,0 +1,68 @@
+# Benchmark: "did you mean" lookups for mistyped emails
+# Run from the repository root: python benchmarks/roster_suggestions.py [rows]
+
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fuzzy_match import SuggestionIndex
+
+DOMAINS = ['gmail.com'] * 6 + ['yahoo.com', 'outlook.com', 'iitb.ac.in', 'college.edu']
+QUERIES = 1000
+
+def make_emails(rows):
+    names = [''.join(random.choices(string.ascii_lowercase, k=random.randint(3, 8))) for _ in range(3000)]
+    emails = set()
+    while len(emails) < rows:
+        number = random.choice(['', str(random.randint(1, 999))])
+        emails.add(f"{random.choice(names)}{random.choice(['', '.'])}{random.choice(names)}{number}@{random.choice(DOMAINS)}")
+    return list(emails)
+
+def make_typo(email):
+    local, domain = email.split('@')
+    position = random.randrange(len(local) - 1)
+    kind = random.choice(['swap', 'drop', 'double', 'replace'])
+    if kind == 'swap':
+        local = local[:position] + local[position + 1] + local[position] + local[position + 2:]
+    elif kind == 'drop':
+        local = local[:position] + local[position + 1:]
+    elif kind == 'double':
+        local = local[:position] + local[position] + local[position:]
+    else:
+        local = local[:position] + random.choice(string.ascii_lowercase) + local[position + 1:]
+    if random.random() < 0.3:
+        domain = domain.replace('gmail', 'gmial')
+    return f"{local}@{domain}"
+
+def main():
+    random.seed(0)
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    emails = make_emails(rows)
+
+    start = time.perf_counter()
+    index = SuggestionIndex(emails)
+    build_time = time.perf_counter() - start
+    stats = index.stats()
+    print(f"Built over {stats['emails']} emails in {build_time:.2f}s: "
+          f"{stats['keys']} keys, {stats['bytes'] / 1024 / 1024:.1f} MiB")
+
+    queries = [(make_typo(email), email) for email in random.sample(emails, QUERIES)]
+    found = 0
+    latencies = []
+    for query, expected in queries:
+        start = time.perf_counter()
+        suggestions = index.suggest(query)
+        latencies.append(time.perf_counter() - start)
+        found += any(match == expected for _, match in suggestions)
+
+    latencies.sort()
+    print(f"Original email suggested for {found}/{QUERIES} typos")
+    print(f"Latency: median {latencies[len(latencies) // 2] * 1e6:.0f}us, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.0f}us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import hashlib
+import math
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings.
+
+    Positions come from one 128-bit blake2b digest split into two 64-bit
+    halves and combined with double hashing, so membership costs one hash
+    call regardless of the number of probes.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.items = 0
+
+        # Lookup outcomes, reported by /rosterstats
+        self.rejected = 0
+        self.passed = 0
+        self.false_positives = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        size = self.size
+        return [(first + i * step) % size for i in range(self.hash_count)]
+
+    def add(self, item):
+        bits = self.bits
+        for position in self._positions(item):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.items += 1
+
+    def __contains__(self, item):
+        bits = self.bits
+        for position in self._positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def estimated_false_positive_rate(self):
+        # (1 - e^(-kn/m))^k for the number of items actually added
+        return (1 - math.exp(-self.hash_count * self.items / self.size)) ** self.hash_count
+
+    def stats(self):
+        checked_misses = self.rejected + self.false_positives
+        return {
+            'items': self.items,
+            'bits': self.size,
+            'hashes': self.hash_count,
+            'bytes': len(self.bits),
+            'estimated_false_positive_rate': self.estimated_false_positive_rate(),
+            'observed_false_positive_rate': self.false_positives / checked_misses if checked_misses else 0.0,
+            'rejected': self.rejected,
+            'passed': self.passed,
+            'false_positives': self.false_positives,
+        }
+
+    @classmethod
+    def from_items(cls, items, capacity=None, error_rate=0.001):
+        bloom = cls(capacity if capacity is not None else len(items), error_rate)
+        for item in items:
+            bloom.add(item)
+        return bloom
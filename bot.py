@@ -1,12 +1,18 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import os
 import importlib
 import sys
-import json
-from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
-from excel_handler import load_excel_data
+import loop_watchdog
+import roster_reloader
+from programs import PROGRAM_TABLE, resolve_role_ids
+from claim_index import ClaimIndex
+from role_registry import RoleRegistry
+from state_store import store
+from unverified_tracker import UnverifiedTracker
+from verified_members import VerifiedMemberIndex
+from welcome_messages import welcome_dispatcher, welcome_tracker
 
 # Load environment variables
 load_dotenv()
@@ -19,15 +25,8 @@ AUTO_ASSIGNED_ROLE_ID = int(os.getenv('AUTO_ASSIGNED_ROLE_ID'))
 WELCOME_CHANNEL_ID = int(os.getenv('WELCOME_CHANNEL_ID'))
 LOG_CHANNEL_ID = int(os.getenv('LOG_CHANNEL_ID', '1292522424054710302'))
 
-# Role IDs
-Role_contri = int(os.getenv('ROLE_CONTRI'))
-Role_contri_wob = int(os.getenv('ROLE_CONTRI_WOB'))
-Role_ca = int(os.getenv('ROLE_CA'))
-Role_ca_wob = int(os.getenv('ROLE_CA_WOB'))
-Role_mentor = int(os.getenv('ROLE_MENTOR'))
-Role_mentor_wob = int(os.getenv('ROLE_MENTOR_WOB'))
-Role_pa = int(os.getenv('ROLE_PA'))
-Role_pa_wob = int(os.getenv('ROLE_PA_WOB'))
+# Role IDs, declared per program role in programs.json
+ROLE_IDS = resolve_role_ids(PROGRAM_TABLE)
 
 # Permission IDs
 ADMIN_IDS = [438560155639087105]
@@ -44,29 +43,8 @@ APSHABD = ["Na raha jara to te? Karu guddi laal?",
            "B--, chup chap apna kaam kr",
            "Bade manhus irade hai apke, ese me bot kre to kya kre?"]
 
-# Constants
-ROLE_PRIORITY = ['Project Admin Wob', 
-                 'Project Admin',
-                 'Mentor Wob', 
-                 'Mentor', 
-                 'Campus Ambassador Wob',
-                 'Campus Ambassador',  
-                 'Contributor Wob', 
-                 'Contributor']
-
-ROLE_PRIORITY_LOWER = ['project admin', 
-                       'mentor', 
-                       'campus ambassador', 
-                       'contributor',
-                       'contributer', 
-                       'pa', 
-                       'ca', 
-                       'contri', 
-                       'CA', 
-                       'PA']
-
-# File paths
-welcome_log = 'welcome_messages.json'
+# Constants, highest priority role first (from programs.json)
+ROLE_PRIORITY = PROGRAM_TABLE['priority']
 
 # Set up intents and bot
 intents = discord.Intents.all()
@@ -83,47 +61,61 @@ print(f"- Guilds: {intents.guilds}")
 # Shared data storage
 bot_data = {
     'excel_data': {},
-    'welcome_messages': {},
-    'cached_unverified_members': [],
+    'roster_filter': None,
+    'roster_collisions': {},
+    'roster_suggestions': None,
     'constants': {
         'ROLE_PRIORITY': ROLE_PRIORITY,
-        'ROLE_PRIORITY_LOWER': ROLE_PRIORITY_LOWER,
         'APSHABD': APSHABD
     },
+    'programs': PROGRAM_TABLE,
     'role_ids': {
-        'Contributor': Role_contri,
-        'Contributor | Wob': Role_contri_wob,
-        'Campus Ambassador': Role_ca,
-        'CA | Wob': Role_ca_wob,
-        'Mentor': Role_mentor,
-        'Mentor | Wob': Role_mentor_wob,
-        'Project Admin': Role_pa,
-        'PA | Wob': Role_pa_wob,
+        **ROLE_IDS,
         'AUTO_ASSIGNED': AUTO_ASSIGNED_ROLE_ID
     }
 }
-
-# Functions for welcome message handling
-def load_welcome_log():
-    if os.path.exists(welcome_log) and os.stat(welcome_log).st_size > 0:
-        try:
-            with open(welcome_log, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {}
-    return {}
-
-def save_welcome_log(welcome_messages):
-    with open(welcome_log, 'w') as f:
-        json.dump(welcome_messages, f, indent=4)
+# Configured role names -> Role objects, resolved in on_ready
+bot_data['roles'] = RoleRegistry(bot_data['role_ids'])
+# Canonical email -> Discord accounts verified with it, loaded in on_ready
+bot_data['email_claims'] = ClaimIndex()
+# Discord ID -> email, roles and nickname of verified members, loaded in on_ready
+bot_data['verified_members'] = VerifiedMemberIndex()
+# IDs of members still needing verification, seeded in on_ready
+bot_data['unverified'] = UnverifiedTracker()
 
 @bot.event
 async def on_ready():
-    # Load Excel data into bot_data
-    bot_data['excel_data'] = load_excel_data()
-    bot_data['welcome_messages'] = load_welcome_log()
+    # Watch the event loop first so a blocking startup step is reported too
+    if not loop_watchdog.watchdog.running:
+        loop_watchdog.watchdog.start()
+
+    # Load Excel data into bot_data off the event loop
+    changes, sheet_stats, elapsed = await roster_reloader.reload_roster(bot_data)
+    print(f"Loaded {len(bot_data['excel_data'])} registered emails in {elapsed:.2f}s")
+    print(roster_reloader.format_sheet_stats(sheet_stats))
+    imported = await store.import_legacy_files()
+    for file_name, rows in imported.items():
+        print(f"Imported {rows} rows from {file_name} into {store.path}")
+    verified = await bot_data['verified_members'].load()
+    print(f"Loaded {verified} verified members to restore on rejoin")
+    claimed = await bot_data['email_claims'].load()
+    print(f"Loaded claims for {claimed} verified emails ({bot_data['email_claims'].policy} policy)")
     
     print(f'{bot.user} has connected to Discord!')
+
+    # Resolve the configured roles once and report any that do not exist
+    guild = bot.get_guild(GUILD_ID)
+    if guild:
+        missing = bot_data['roles'].resolve(guild)
+        print(f"Resolved {len(bot_data['roles'])} configured roles")
+        if missing:
+            await report_missing_roles(missing, "not found in the server")
+        # Seed once; reconnects keep the set current from member events
+        if not bot_data['unverified'].seeded:
+            count = await bot_data['unverified'].seed(guild)
+            print(f"Tracking {count} unverified members")
+    else:
+        print(f"Guild {GUILD_ID} not found, configured roles are unresolved")
     
     # Set bot activity
     activity = discord.Activity(
@@ -144,40 +136,91 @@ async def on_ready():
         traceback.print_exc()
 
     # Start tasks
-    cleanup_welcome_messages.start()
+    if not welcome_tracker.running:
+        # Rebuilds the expiry schedule from the messages saved before a restart
+        pending = await welcome_tracker.start(bot.get_channel(WELCOME_CHANNEL_ID))
+        print(f"Scheduled {pending} pending welcome messages for deletion")
+    if not roster_reloader.watch_roster.is_running():
+        roster_reloader.watch_roster.start(bot_data)
+    if not loop_watchdog.report_stalls.is_running():
+        loop_watchdog.report_stalls.start(bot)
     
     # Start verification module tasks
     try:
         import Verification_Module.verify as verify_module
         verify_module.start_background_tasks()
         print("Started verification module background tasks")
+
+        # Pick up bulk jobs interrupted by a restart
+        import job_engine
+        resumed = await job_engine.resume_jobs(bot, bot_data)
+        if resumed:
+            print(f"Resumed {resumed} bulk jobs")
     except Exception as e:
         print(f"Error starting verification tasks: {e}")
         import traceback
         traceback.print_exc()
-    
+
     print(f'Bot is ready, logged in as {bot.user}')
 
+async def report_missing_roles(names, reason):
+    message = "Configured roles " + reason + ": " + ", ".join(
+        f"{name} ({bot_data['role_ids'].get(name)})" for name in names
+    )
+    print(message)
+    log_channel = bot.get_channel(LOG_CHANNEL_ID)
+    if log_channel:
+        await log_channel.send(f":warning: {message}. Verification will skip them until fixed.")
+
+@bot.event
+async def on_guild_role_create(role):
+    if role.guild.id == GUILD_ID:
+        bot_data['roles'].role_created(role)
+
+@bot.event
+async def on_guild_role_update(before, after):
+    if after.guild.id == GUILD_ID:
+        bot_data['roles'].role_updated(after)
+
+@bot.event
+async def on_guild_role_delete(role):
+    if role.guild.id == GUILD_ID:
+        names = bot_data['roles'].role_deleted(role)
+        if names:
+            await report_missing_roles(names, "were deleted")
+
 @bot.event
 async def on_member_join(member):
-    role = discord.utils.get(member.guild.roles, id=AUTO_ASSIGNED_ROLE_ID)
+    if member.guild.id == GUILD_ID:
+        bot_data['unverified'].member_joined(member)
+
+    # Members who verified before and come back get their roles straight back
+    import Verification_Module.verify as verify_module
+    if await verify_module.restore_verified_member(member):
+        return
+
+    role = bot_data['roles'].get('AUTO_ASSIGNED')
     if role:
         await member.add_roles(role)
         print(f"Assigned unverified role to {member.name}")
 
         welcome_channel = bot.get_channel(WELCOME_CHANNEL_ID)
         if welcome_channel:
-            welcome_message = await welcome_channel.send(
-                f"Welcome to the server, {member.mention}! To get access to GSSoC, please verify your selection by using the command `/verify registered-email-id`"
-            )
-            bot_data['welcome_messages'][member.id] = {
-                "message_id": welcome_message.id,
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            }
-            save_welcome_log(bot_data['welcome_messages'])
+            # Joins close together share one welcome message
+            await welcome_dispatcher.welcome(welcome_channel, member)
         else:
             print(f"Failed to find the welcome channel {WELCOME_CHANNEL_ID}")
 
+@bot.event
+async def on_member_update(before, after):
+    if after.guild.id == GUILD_ID and before.roles != after.roles:
+        bot_data['unverified'].member_updated(after)
+
+@bot.event
+async def on_member_remove(member):
+    if member.guild.id == GUILD_ID:
+        bot_data['unverified'].member_removed(member)
+
 @bot.event
 async def on_command_error(ctx, error):
     if isinstance(error, commands.CommandNotFound):
@@ -251,26 +294,6 @@ async def on_command_error(ctx, error):
         import traceback
         traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
 
-@tasks.loop(minutes=30)
-async def cleanup_welcome_messages():
-    now = datetime.now(timezone.utc)
-    welcome_messages = bot_data['welcome_messages']
-    stale_messages = {member_id: data for member_id, data in welcome_messages.items()
-                      if now - datetime.fromisoformat(data["timestamp"]) > timedelta(hours=1)}
-
-    welcome_channel = bot.get_channel(WELCOME_CHANNEL_ID)
-    if welcome_channel:
-        for member_id, data in stale_messages.items():
-            try:
-                message_id = data["message_id"]
-                message = await welcome_channel.fetch_message(message_id)
-                await message.delete()
-                del welcome_messages[member_id]
-            except discord.NotFound:
-                print(f"Message {message_id} not found.")
-        save_welcome_log(welcome_messages)
-        bot_data['welcome_messages'] = welcome_messages
-
 # Load command modules
 def load_commands():
     # Create necessary directories if they don't exist
@@ -389,4 +412,8 @@ async def on_app_command_error(interaction: discord.Interaction, error):
 
 if __name__ == "__main__":
     load_commands()
-    bot.run(TOKEN)
+    try:
+        bot.run(TOKEN)
+    finally:
+        # Commit any buffered state writes before exiting
+        store.close()
@@ -0,0 +1,108 @@
+import os
+from dotenv import load_dotenv
+from email_canonical import canonical_email
+from state_store import store
+
+load_dotenv()
+
+# What /verify does when an email was already used by another account:
+#   refuse  - never verify a second account with it
+#   flag    - verify, and report the shared email to the log channel
+#   reclaim - verify only once every earlier account has left the server
+CLAIM_POLICY = os.getenv('EMAIL_CLAIM_POLICY', 'reclaim').strip().lower()
+CLAIM_POLICIES = ('refuse', 'flag', 'reclaim')
+
+if CLAIM_POLICY not in CLAIM_POLICIES:
+    print(f"Unknown EMAIL_CLAIM_POLICY {CLAIM_POLICY!r}, using 'reclaim'")
+    CLAIM_POLICY = 'reclaim'
+
+class ClaimIndex:
+    """Which Discord accounts have verified with each roster email.
+
+    Persisted in the state store's ``email_claims`` table, backfilled from
+    the verification log and held in memory both ways (email -> accounts,
+    account -> emails), so the check in ``/verify`` and the admin lookup
+    are dict probes instead of a scan of the log.
+    """
+
+    def __init__(self, policy=CLAIM_POLICY):
+        self.policy = policy
+        self._by_email = {}
+        self._by_member = {}
+        # (email, discord_id) held by a verification still in progress
+        self._reserved = set()
+
+    async def load(self):
+        """Backfill claims from new verification log rows, then load them all;
+        returns the number of emails claimed."""
+        await store.backfill_email_claims(canonical_email)
+        self._by_email = {}
+        self._by_member = {}
+        self._reserved = set()
+        for row in await store.load_email_claims():
+            self._add(row['email'], row['discord_id'], row['claimed'])
+        return len(self._by_email)
+
+    def _add(self, email, discord_id, claimed):
+        self._by_email.setdefault(email, {}).setdefault(discord_id, claimed)
+        self._by_member.setdefault(discord_id, set()).add(email)
+
+    def __len__(self):
+        return len(self._by_email)
+
+    def claimants(self, email):
+        """``{discord_id: claimed_time}`` of the accounts that verified with ``email``."""
+        return dict(self._by_email.get(canonical_email(email), {}))
+
+    def emails_for(self, discord_id):
+        return sorted(self._by_member.get(discord_id, ()))
+
+    def check(self, email, discord_id, guild):
+        """Apply the claim policy to ``discord_id`` verifying with ``email``.
+
+        Returns ``(allowed, other_claimants)``; ``other_claimants`` lists the
+        other accounts that already verified with the email.
+        """
+        others = [member_id for member_id in self._by_email.get(canonical_email(email), {})
+                  if member_id != discord_id]
+        if not others or self.policy == 'flag':
+            return True, others
+        if self.policy == 'reclaim':
+            return all(guild.get_member(member_id) is None for member_id in others), others
+        return False, others
+
+    def reserve(self, email, discord_id):
+        """Hold ``email`` for ``discord_id`` in memory while its verification
+        runs, so a second account checked meanwhile sees it. ``claim`` makes
+        the reservation permanent and ``release`` gives it up."""
+        email = canonical_email(email)
+        if discord_id in self._by_email.get(email, {}):
+            return
+        self._add(email, discord_id, None)
+        self._reserved.add((email, discord_id))
+
+    def release(self, email, discord_id):
+        """Drop a reservation that was never claimed."""
+        email = canonical_email(email)
+        if (email, discord_id) not in self._reserved:
+            return
+        self._reserved.discard((email, discord_id))
+        claimants = self._by_email.get(email, {})
+        claimants.pop(discord_id, None)
+        if not claimants:
+            self._by_email.pop(email, None)
+        emails = self._by_member.get(discord_id, set())
+        emails.discard(email)
+        if not emails:
+            self._by_member.pop(discord_id, None)
+
+    async def claim(self, email, discord_id, claimed):
+        email = canonical_email(email)
+        if (email, discord_id) in self._reserved:
+            self._reserved.discard((email, discord_id))
+            self._by_email[email][discord_id] = claimed
+        elif discord_id in self._by_email.get(email, {}):
+            return
+        else:
+            self._add(email, discord_id, claimed)
+        await store.save_email_claim(email, discord_id, claimed)
@@ -0,0 +1,47 @@
+import discord
+from discord.ext import commands
+import job_engine
+from Verification_Module import bulk_verify
+
+# Largest CSV accepted, roughly 100k rows
+MAX_CSV_BYTES = 5 * 1024 * 1024
+
+def setup(bot, tree, bot_data, admin_ids, homies):
+
+    @bot.hybrid_command(
+        name="bulkverify",
+        description="Verify members in bulk from a CSV of Discord IDs and emails"
+    )
+    @commands.guild_only()
+    async def bulk_verify_command(ctx, attachment: discord.Attachment):
+        # Check permissions
+        if ctx.author.id not in admin_ids and not ctx.author.guild_permissions.administrator:
+            await ctx.send("You do not have permission to use this command.")
+            return
+
+        if attachment.size > MAX_CSV_BYTES:
+            await ctx.send(f"That file is too large, the limit is {MAX_CSV_BYTES // (1024 * 1024)} MB.")
+            return
+
+        await ctx.defer(ephemeral=True)
+
+        try:
+            rows = bulk_verify.parse_rows(await attachment.read())
+        except Exception as e:
+            await ctx.send(f"Could not read the CSV: {str(e)}")
+            return
+        if not rows:
+            await ctx.send("The CSV has no rows. Expected columns: discord_id, email")
+            return
+
+        # Every row is checked against the roster now; only matches are left to process
+        items = bulk_verify.resolve_rows(rows, bot_data)
+        job, status_message = await job_engine.create_job(
+            bot, bot_data, bulk_verify.JOB_KIND, ctx.channel, ctx.author.id, items
+        )
+        pending = sum(1 for item in items if item[2] is None)
+
+        await ctx.send(
+            f"Started bulk verification #{job['id']} for {len(rows)} rows "
+            f"({pending} matched the roster). Progress: {status_message.jump_url}"
+        )
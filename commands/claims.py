@@ -0,0 +1,45 @@
+import discord
+from discord.ext import commands
+from typing import Optional
+
+def setup(bot, tree, bot_data, admin_ids, homies):
+
+    @bot.hybrid_command(
+        name="emailclaims",
+        description="Show which accounts verified with an email, or which emails an account used"
+    )
+    @commands.guild_only()
+    async def email_claims(ctx, email: Optional[str] = None, user: Optional[discord.User] = None):
+        # Check permissions
+        if ctx.author.id not in admin_ids and not ctx.author.guild_permissions.administrator:
+            await ctx.send("You do not have permission to view email claims.")
+            return
+
+        if not email and not user:
+            await ctx.send("Give an email, a user, or both.", ephemeral=True)
+            return
+
+        claims = bot_data['email_claims']
+        embed = discord.Embed(
+            title="Email Claims",
+            description=f"{len(claims)} emails claimed, policy: {claims.policy}",
+            color=discord.Color.blurple(),
+            timestamp=discord.utils.utcnow()
+        )
+        if email:
+            claimants = claims.claimants(email)
+            value = "\n".join(
+                f"<@{member_id}> (`{member_id}`) since {claimed[:10] if claimed else 'unknown'}"
+                + ("" if ctx.guild.get_member(member_id) else " - left")
+                for member_id, claimed in sorted(claimants.items(), key=lambda item: item[1] or '')
+            )
+            embed.add_field(name=f"Accounts verified with {email}", value=value or "None", inline=False)
+        if user:
+            emails = claims.emails_for(user.id)
+            embed.add_field(
+                name=f"Emails used by {user.name}",
+                value="\n".join(f"`{claimed_email}`" for claimed_email in emails) or "None",
+                inline=False
+            )
+
+        await ctx.send(embed=embed, ephemeral=True)
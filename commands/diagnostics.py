@@ -0,0 +1,77 @@
+import discord
+from discord.ext import commands
+import loop_watchdog
+from Verification_Module.work_queue import verification_queue
+
+def setup(bot, tree, bot_data, admin_ids, homies):
+
+    @bot.hybrid_command(
+        name="looplag",
+        description="Show event loop lag percentiles and recent stalls"
+    )
+    @commands.guild_only()
+    async def loop_lag(ctx):
+        # Check permissions
+        if ctx.author.id not in admin_ids and not ctx.author.guild_permissions.administrator:
+            await ctx.send("You do not have permission to view bot diagnostics.")
+            return
+
+        watchdog = loop_watchdog.watchdog
+        embed = discord.Embed(
+            title="Event Loop Lag",
+            description=f"Over the last {len(watchdog.samples)} samples "
+                        f"({watchdog.interval * len(watchdog.samples):.0f}s)",
+            color=discord.Color.blurple(),
+            timestamp=discord.utils.utcnow()
+        )
+        embed.add_field(name="Lag", value=loop_watchdog.format_percentiles(watchdog.percentiles()), inline=False)
+        embed.add_field(
+            name="Stalls",
+            value=f"{watchdog.stall_count} over {watchdog.threshold * 1000:.0f}ms since startup, "
+                  f"{len(watchdog.stalls)} waiting to be reported",
+            inline=False
+        )
+
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @bot.hybrid_command(
+        name="verifyqueue",
+        description="Show verification queue depth, wait time and throughput"
+    )
+    @commands.guild_only()
+    async def verify_queue(ctx):
+        # Check permissions
+        if ctx.author.id not in admin_ids and not ctx.author.guild_permissions.administrator:
+            await ctx.send("You do not have permission to view bot diagnostics.")
+            return
+
+        stats = verification_queue.stats()
+        embed = discord.Embed(
+            title="Verification Queue",
+            description=f"{stats['depth']} / {stats['capacity']} waiting, "
+                        f"{stats['busy']} / {stats['workers']} workers busy",
+            color=discord.Color.blurple(),
+            timestamp=discord.utils.utcnow()
+        )
+        embed.add_field(
+            name="Wait time",
+            value=f"p50 {stats['wait_p50']:.1f}s / p95 {stats['wait_p95']:.1f}s",
+            inline=True
+        )
+        embed.add_field(name="Throughput", value=f"{stats['per_minute']} per minute", inline=True)
+        embed.add_field(
+            name="REST calls per verification",
+            value=f"{stats['rest_per_job']:.1f} ({stats['member_rest_per_job']:.1f} on member routes)",
+            inline=True
+        )
+        embed.add_field(
+            name="Jobs",
+            value=f"{stats['submitted']} queued, {stats['completed']} done, {stats['failed']} failed, "
+                  f"{stats['rejected']} turned away (queue full)",
+            inline=False
+        )
+        rate_limited = "\n".join(f"`{route}`: {hits}" for route, hits in
+                                 sorted(stats['rate_limited'].items(), key=lambda item: -item[1])[:10])
+        embed.add_field(name="429s by route", value=rate_limited or "None", inline=False)
+
+        await ctx.send(embed=embed, ephemeral=True)
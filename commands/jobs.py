@@ -0,0 +1,57 @@
+import discord
+from discord.ext import commands
+import job_engine
+from state_store import store
+
+def setup(bot, tree, bot_data, admin_ids, homies):
+
+    @bot.hybrid_group(
+        name="jobs",
+        description="List recent bulk jobs (mass role, bulk verification)",
+        fallback="list"
+    )
+    @commands.guild_only()
+    async def jobs(ctx):
+        # Check permissions
+        if ctx.author.id not in admin_ids and not ctx.author.guild_permissions.administrator:
+            await ctx.send("You do not have permission to view bulk jobs.")
+            return
+
+        recent = await store.recent_jobs(10)
+        embed = discord.Embed(
+            title="Bulk Jobs",
+            description="Most recent first" if recent else "No jobs yet",
+            color=discord.Color.blurple(),
+            timestamp=discord.utils.utcnow()
+        )
+        for job in recent:
+            counts = await store.job_result_counts(job['id'])
+            total = sum(counts.values())
+            kind = job_engine.KINDS.get(job['kind'])
+            state = job['state']
+            if state == 'running' and not job_engine.is_running(job['id']):
+                state = 'running (not started here)'
+            embed.add_field(
+                name=f"#{job['id']} {kind.title if kind else job['kind']} - {state}",
+                value=f"{total - counts.get('pending', 0)} / {total} done, "
+                      f"{sum(counts.get(result, 0) for result in (kind.failures if kind else ('failed',)))} failed, "
+                      f"by <@{job['requested_by']}> on {(job['created'] or '')[:16].replace('T', ' ')}",
+                inline=False
+            )
+
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @jobs.command(
+        name="cancel",
+        description="Cancel a running bulk job"
+    )
+    async def cancel(ctx, job_id: int):
+        # Check permissions
+        if ctx.author.id not in admin_ids and not ctx.author.guild_permissions.administrator:
+            await ctx.send("You do not have permission to cancel bulk jobs.")
+            return
+
+        if await job_engine.cancel_job(job_id):
+            await ctx.send(f"Cancelling job #{job_id}; items already in progress will finish first.")
+        else:
+            await ctx.send(f"Job #{job_id} is not running.", ephemeral=True)
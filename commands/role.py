@@ -1,6 +1,48 @@
 import discord
 import os
 from discord.ext import commands
+import job_engine
+
+MASS_ROLE_LABELS = {
+    'done': "Updated",
+    'unchanged': "Already had/didn't have the role",
+    'not_in_server': "Left the server",
+    'role_missing': "Role deleted",
+    'forbidden': "Missing permissions",
+    'failed': "Failed",
+}
+
+async def mass_role_item(guild, bot_data, job, item):
+    params = job['params']
+    role = guild.get_role(params['role_id'])
+    if role is None:
+        return 'role_missing', str(params['role_id'])
+    member = guild.get_member(item['target_id'])
+    if member is None:
+        try:
+            member = await guild.fetch_member(item['target_id'])
+        except discord.NotFound:
+            return 'not_in_server', ''
+
+    # Checked again here: a resumed job may reach members already updated
+    adding = params['action'] == 'add'
+    if (role in member.roles) == adding:
+        return 'unchanged', ''
+    reason = f"Mass role {params['action']} by {params['requested_by_name']}: {params['reason']}"
+    try:
+        if adding:
+            await member.add_roles(role, reason=reason)
+        else:
+            await member.remove_roles(role, reason=reason)
+    except discord.Forbidden as e:
+        return 'forbidden', e.text or "Forbidden"
+    return 'done', ''
+
+job_engine.register_kind(job_engine.JobKind(
+    'massrole', "Mass Role", mass_role_item, MASS_ROLE_LABELS,
+    failures=('not_in_server', 'role_missing', 'forbidden', 'failed'),
+    concurrency=job_engine.JOB_CONCURRENCY
+))
 
 def setup(bot, tree, bot_data, admin_ids, homies):
    
@@ -302,75 +344,47 @@ def setup(bot, tree, bot_data, admin_ids, homies):
             return
             
         await ctx.defer(ephemeral=False)
-        
-        try:
-            # Get members to modify
-            members = []
-            
-            if filter_role:
-                members = [member for member in ctx.guild.members if filter_role in member.roles]
-            else:
-                members = ctx.guild.members
-                
-            # Counters
-            success_count = 0
-            already_count = 0  # Already has/doesn't have role
-            error_count = 0
-                
-            for member in members:
-                try:
-                    if action == "add":
-                        if role in member.roles:
-                            already_count += 1
-                            continue
-                            
-                        await member.add_roles(role, reason=f"Mass role add by {ctx.author.name}: {reason}")
-                        success_count += 1
-                    else:  # remove
-                        if role not in member.roles:
-                            already_count += 1
-                            continue
-                            
-                        await member.remove_roles(role, reason=f"Mass role remove by {ctx.author.name}: {reason}")
-                        success_count += 1
-                except:
-                    error_count += 1
-            
-            # Build status message
-            action_str = "added to" if action == "add" else "removed from"
-            status = f"Role {role.mention} {action_str} {success_count} members"
-            
-            if already_count > 0:
-                status += f", {already_count} already had/didn't have the role"
-                
-            if error_count > 0:
-                status += f", {error_count} errors"
-                
-            await ctx.followup.send(status)
-            
-            # Log the action
-            log_channel_id = int(os.getenv('LOG_CHANNEL_ID', 0))
-            if log_channel_id:
-                log_channel = ctx.guild.get_channel(log_channel_id)
-                if log_channel:
-                    embed = discord.Embed(
-                        title=f"Mass Role {action.capitalize()}",
-                        description=f"Role {role.mention} mass {action_str} members",
-                        color=role.color,
-                        timestamp=ctx.message.created_at if hasattr(ctx, 'message') else discord.utils.utcnow()
-                    )
-                    
-                    filter_str = f"with {filter_role.mention} role" if filter_role else "all members"
-                    
-                    embed.add_field(name="Filter", value=filter_str, inline=True)
-                    embed.add_field(name="Performed by", value=ctx.author.mention, inline=True)
-                    embed.add_field(name="Reason", value=reason, inline=True)
-                    embed.add_field(name="Results", value=status, inline=False)
-                    
-                    await log_channel.send(embed=embed)
-                    
-        except Exception as e:
-            await ctx.followup.send(
-                f"An error occurred: {str(e)}",
-                ephemeral=True
-            )
+
+        # Snapshot the targets now; members already in the wanted state are
+        # recorded straight away and the rest are handled by the job engine
+        members = [member for member in ctx.guild.members if filter_role is None or filter_role in member.roles]
+        adding = action == "add"
+        items = [(member.id, {}, 'unchanged' if (role in member.roles) == adding else None, '')
+                 for member in members]
+        params = {
+            'role_id': role.id,
+            'action': action,
+            'filter_role_id': filter_role.id if filter_role else None,
+            'reason': reason,
+            'requested_by_name': ctx.author.name,
+        }
+        job, status_message = await job_engine.create_job(bot, bot_data, 'massrole', ctx.channel, ctx.author.id,
+                                                          items, params)
+
+        action_str = "added to" if adding else "removed from"
+        pending = sum(1 for item in items if item[2] is None)
+        await ctx.send(
+            f"Started mass role job #{job['id']}: {role.mention} will be {action_str} {pending} members "
+            f"({len(items) - pending} already had/didn't have it). Progress: {status_message.jump_url}"
+        )
+
+        # Log the action
+        log_channel_id = int(os.getenv('LOG_CHANNEL_ID', 0))
+        if log_channel_id:
+            log_channel = ctx.guild.get_channel(log_channel_id)
+            if log_channel:
+                embed = discord.Embed(
+                    title=f"Mass Role {action.capitalize()}",
+                    description=f"Role {role.mention} mass {action_str} members (job #{job['id']})",
+                    color=role.color,
+                    timestamp=ctx.message.created_at if hasattr(ctx, 'message') else discord.utils.utcnow()
+                )
+
+                filter_str = f"with {filter_role.mention} role" if filter_role else "all members"
+
+                embed.add_field(name="Filter", value=filter_str, inline=True)
+                embed.add_field(name="Performed by", value=ctx.author.mention, inline=True)
+                embed.add_field(name="Reason", value=reason, inline=True)
+                embed.add_field(name="Members", value=f"{pending} to update, {len(items) - pending} unchanged", inline=False)
+
+                await log_channel.send(embed=embed)
@@ -0,0 +1,133 @@
+import discord
+import os
+from discord.ext import commands
+import roster_reloader
+
+def setup(bot, tree, bot_data, admin_ids, homies):
+
+    @bot.hybrid_command(
+        name="reloadroster",
+        description="Reload the registration sheets without restarting the bot"
+    )
+    @commands.guild_only()
+    async def reload_roster(ctx, trace_memory: bool = False):
+        # Check permissions
+        if ctx.author.id not in admin_ids and not ctx.author.guild_permissions.administrator:
+            await ctx.send("You do not have permission to reload the roster.")
+            return
+
+        await ctx.defer(ephemeral=True)
+
+        try:
+            changes, sheet_stats, elapsed = await roster_reloader.reload_roster(bot_data, trace_memory)
+        except Exception as e:
+            await ctx.send(f"Failed to reload the roster, still serving the previous one: {str(e)}")
+            return
+
+        embed = discord.Embed(
+            title="Roster Reloaded",
+            description=f"Loaded {len(bot_data['excel_data'])} registered emails in {elapsed:.2f}s",
+            color=discord.Color.green(),
+            timestamp=discord.utils.utcnow()
+        )
+        for role_name, (added, removed) in changes.items():
+            embed.add_field(name=role_name, value=f"+{added} / -{removed}", inline=True)
+        embed.add_field(name="Sheets parsed", value=roster_reloader.format_sheet_stats(sheet_stats), inline=False)
+
+        await ctx.send(embed=embed)
+
+        # Log the action
+        log_channel_id = int(os.getenv('LOG_CHANNEL_ID', 0))
+        if log_channel_id:
+            log_channel = ctx.guild.get_channel(log_channel_id)
+            if log_channel:
+                embed.add_field(name="Reloaded by", value=ctx.author.mention, inline=False)
+                await log_channel.send(embed=embed)
+
+    @bot.hybrid_command(
+        name="rosterstats",
+        description="Show roster index and email filter statistics"
+    )
+    @commands.guild_only()
+    async def roster_stats(ctx):
+        # Check permissions
+        if ctx.author.id not in admin_ids and not ctx.author.guild_permissions.administrator:
+            await ctx.send("You do not have permission to view roster statistics.")
+            return
+
+        embed = discord.Embed(
+            title="Roster Statistics",
+            description=f"{len(bot_data['excel_data'])} registered emails in the index",
+            color=discord.Color.blurple(),
+            timestamp=discord.utils.utcnow()
+        )
+
+        collisions = bot_data.get('roster_collisions', {})
+        embed.add_field(
+            name="Canonical collisions",
+            value=f"{len(collisions)} (see /rostercollisions)" if collisions else "None",
+            inline=False
+        )
+
+        suggestions = bot_data.get('roster_suggestions')
+        if suggestions is not None:
+            stats = suggestions.stats()
+            embed.add_field(
+                name="Typo suggestion index",
+                value=f"{stats['keys']} keys over {stats['emails']} emails and {stats['domains']} domains, "
+                      f"{stats['bytes'] / 1024 / 1024:.1f} MiB",
+                inline=False
+            )
+
+        email_filter = bot_data.get('roster_filter')
+        if email_filter is None:
+            embed.add_field(name="Email filter", value="Not built yet", inline=False)
+        else:
+            stats = email_filter.stats()
+            embed.add_field(name="Filter memory", value=f"{stats['bytes'] / 1024:.1f} KiB", inline=True)
+            embed.add_field(name="Bits / hashes", value=f"{stats['bits']} / {stats['hashes']}", inline=True)
+            embed.add_field(
+                name="False positive rate",
+                value=f"{stats['estimated_false_positive_rate']:.4%} expected, "
+                      f"{stats['observed_false_positive_rate']:.4%} observed",
+                inline=False
+            )
+            embed.add_field(
+                name="Lookups",
+                value=f"{stats['rejected']} rejected by the filter, {stats['passed']} passed, "
+                      f"{stats['false_positives']} false positives",
+                inline=False
+            )
+
+        await ctx.send(embed=embed)
+
+    @bot.hybrid_command(
+        name="rostercollisions",
+        description="List roster rows whose emails normalize to the same address"
+    )
+    @commands.guild_only()
+    async def roster_collisions(ctx):
+        # Check permissions
+        if ctx.author.id not in admin_ids and not ctx.author.guild_permissions.administrator:
+            await ctx.send("You do not have permission to view roster collisions.")
+            return
+
+        collisions = bot_data.get('roster_collisions', {})
+        if not collisions:
+            await ctx.send("No roster emails collide after normalization.")
+            return
+
+        lines = []
+        for canonical, spellings in sorted(collisions.items()):
+            rows = ", ".join(f"`{spelling}` ({', '.join(sorted(roles))})" for spelling, roles in sorted(spellings.items()))
+            lines.append(f"**{canonical}**: {rows}")
+
+        # Discord messages are capped at 2000 characters
+        report = ""
+        for shown, line in enumerate(lines):
+            if len(report) + len(line) > 1800:
+                report += f"...and {len(lines) - shown} more"
+                break
+            report += line + "\n"
+
+        await ctx.send(f"{len(collisions)} canonical emails are shared by several roster rows:\n{report}")
@@ -1,17 +1,11 @@
 import discord
 import os
-import json
 from datetime import datetime
-
-# File to store warning data
-warnings_file = 'warnings.json'
+from state_store import store
 
 def setup(bot, tree, bot_data, admin_ids, homies):
     guild_id = int(os.getenv('DISCORD_GUILD_ID'))
     
-    # Load warnings data
-    warnings_data = load_warnings()
-    
     @tree.command(
         name="warn",
         description="Warn a user for rule violations",
@@ -23,36 +17,10 @@ def setup(bot, tree, bot_data, admin_ids, homies):
             await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
             return
         
-        # Add warning to the user
-        guild_id_str = str(interaction.guild.id)
-        user_id_str = str(user.id)
-        
-        # Initialize guild entry if it doesn't exist
-        if guild_id_str not in warnings_data:
-            warnings_data[guild_id_str] = {}
-            
-        # Initialize user entry if it doesn't exist
-        if user_id_str not in warnings_data[guild_id_str]:
-            warnings_data[guild_id_str][user_id_str] = {
-                "count": 0,
-                "warnings": []
-            }
-        
-        # Add the warning
-        warning_entry = {
-            "reason": reason,
-            "moderator": str(interaction.user.id),
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        warnings_data[guild_id_str][user_id_str]["warnings"].append(warning_entry)
-        warnings_data[guild_id_str][user_id_str]["count"] += 1
-        
-        # Save the updated warnings data
-        save_warnings(warnings_data)
-        
-        # Get the total number of warnings for this user
-        warning_count = warnings_data[guild_id_str][user_id_str]["count"]
+        # Add the warning and get the total number of warnings for this user
+        warning_count = await store.add_warning(
+            interaction.guild.id, user.id, reason, interaction.user.id, datetime.now().isoformat()
+        )
         
         # Send confirmation
         await interaction.response.send_message(
@@ -130,19 +98,15 @@ def setup(bot, tree, bot_data, admin_ids, homies):
                 await interaction.response.send_message("You do not have permission to check other users' warnings.", ephemeral=True)
                 return
         
-        guild_id_str = str(interaction.guild.id)
-        user_id_str = str(user.id)
+        warnings = await store.get_warnings(interaction.guild.id, user.id)
         
         # Check if user has any warnings
-        if (guild_id_str not in warnings_data or 
-            user_id_str not in warnings_data[guild_id_str] or 
-            warnings_data[guild_id_str][user_id_str]["count"] == 0):
+        if not warnings:
             await interaction.response.send_message(f"{user.mention} has no warnings.", ephemeral=True)
             return
         
         # Display warnings
-        warning_count = warnings_data[guild_id_str][user_id_str]["count"]
-        warnings = warnings_data[guild_id_str][user_id_str]["warnings"]
+        warning_count = len(warnings)
         
         embed = discord.Embed(
             title=f"Warnings for {user.name}",
@@ -178,23 +142,16 @@ def setup(bot, tree, bot_data, admin_ids, homies):
             await interaction.response.send_message("You do not have permission to clear warnings.", ephemeral=True)
             return
         
-        guild_id_str = str(interaction.guild.id)
-        user_id_str = str(user.id)
+        warnings = await store.get_warnings(interaction.guild.id, user.id)
         
         # Check if user has any warnings
-        if (guild_id_str not in warnings_data or 
-            user_id_str not in warnings_data[guild_id_str] or 
-            warnings_data[guild_id_str][user_id_str]["count"] == 0):
+        if not warnings:
             await interaction.response.send_message(f"{user.mention} has no warnings to clear.", ephemeral=True)
             return
         
         if clear_all:
             # Clear all warnings
-            warnings_data[guild_id_str][user_id_str] = {
-                "count": 0,
-                "warnings": []
-            }
-            save_warnings(warnings_data)
+            await store.clear_warnings(interaction.guild.id, user.id)
             
             await interaction.response.send_message(
                 f"All warnings for {user.mention} have been cleared.",
@@ -202,17 +159,15 @@ def setup(bot, tree, bot_data, admin_ids, homies):
             )
         elif warning_index is not None:
             # Clear a specific warning
-            if warning_index < 1 or warning_index > len(warnings_data[guild_id_str][user_id_str]["warnings"]):
+            if warning_index < 1 or warning_index > len(warnings):
                 await interaction.response.send_message(
-                    f"Invalid warning index. User has {len(warnings_data[guild_id_str][user_id_str]['warnings'])} warnings.",
+                    f"Invalid warning index. User has {len(warnings)} warnings.",
                     ephemeral=True
                 )
                 return
             
             # Remove the warning
-            warnings_data[guild_id_str][user_id_str]["warnings"].pop(warning_index - 1)
-            warnings_data[guild_id_str][user_id_str]["count"] -= 1
-            save_warnings(warnings_data)
+            await store.delete_warning(interaction.guild.id, user.id, warning_index)
             
             await interaction.response.send_message(
                 f"Warning #{warning_index} for {user.mention} has been cleared.",
@@ -239,18 +194,3 @@ def setup(bot, tree, bot_data, admin_ids, homies):
                 embed.set_footer(text=f"ID: {user.id}")
                 
                 await log_channel.send(embed=embed)
-
-
-def load_warnings():
-    if os.path.exists(warnings_file) and os.stat(warnings_file).st_size > 0:
-        try:
-            with open(warnings_file, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {}
-    return {}
-
-
-def save_warnings(warnings_data):
-    with open(warnings_file, 'w') as f:
-        json.dump(warnings_data, f, indent=4) 
\ No newline at end of file
@@ -0,0 +1,56 @@
+import hashlib
+import json
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Per-domain canonicalization rules; domains not listed use "default"
+EMAIL_RULES_FILE = os.getenv('EMAIL_RULES_FILE', 'email_rules.json')
+
+def load_email_rules(path=EMAIL_RULES_FILE):
+    """Compile the rules file into ``(default_rule, {domain: rule})`` where a
+    rule is a ``(strip_plus, strip_dots, canonical_domain)`` tuple."""
+    if not os.path.exists(path):
+        return (False, False, None), {}
+    with open(path, 'r') as f:
+        config = json.load(f)
+
+    def compile_rule(rule):
+        return (bool(rule.get('strip_plus', False)),
+                bool(rule.get('strip_dots', False)),
+                rule.get('canonical_domain'))
+
+    default = compile_rule(config.get('default', {}))
+    domains = {domain.lower(): compile_rule(rule) for domain, rule in config.get('domains', {}).items()}
+    return default, domains
+
+DEFAULT_RULE, DOMAIN_RULES = load_email_rules()
+
+def rules_fingerprint(default_rule=None, domain_rules=None):
+    """Short digest of the rules, so canonical emails stored on disk can be
+    trusted only while the rules that produced them are unchanged."""
+    rules = [default_rule or DEFAULT_RULE, sorted((domain_rules if domain_rules is not None else DOMAIN_RULES).items())]
+    return hashlib.sha256(json.dumps(rules).encode('utf-8')).hexdigest()[:16]
+
+def canonical_email(email, default_rule=None, domain_rules=None):
+    """Reduce an email to the form the roster index is keyed by.
+
+    Whitespace anywhere and letter case never matter; depending on the domain,
+    "+tag" suffixes and dots in the local part are dropped and the domain may
+    be replaced, so " Foo.Bar+gssoc@GoogleMail.com " becomes "foobar@gmail.com".
+    """
+    email = ''.join(email.split()).lower()
+    local, at, domain = email.rpartition('@')
+    if not at or not local:
+        return email
+
+    if domain_rules is None:
+        domain_rules = DOMAIN_RULES
+    strip_plus, strip_dots, canonical_domain = domain_rules.get(domain, default_rule or DEFAULT_RULE)
+    canonical_local = local
+    if strip_plus:
+        canonical_local = canonical_local.split('+', 1)[0]
+    if strip_dots:
+        canonical_local = canonical_local.replace('.', '')
+    return f"{canonical_local or local}@{canonical_domain or domain}"
@@ -1,43 +1,250 @@
-import pandas as pd
+import hashlib
+import multiprocessing
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
 
-# Paths to your Excel files
-EXCEL_1 = './Excel-Sheets/contributor_Data.xlsx'
-EXCEL_2 = './Excel-Sheets/CA.xlsx'
-EXCEL_3 = './Excel-Sheets/MENTOR.xlsx'
-EXCEL_4 = './Excel-Sheets/PA.xlsx'
-EXCEL_5 = './Excel-Sheets/CA2.xlsx'  # Second sheet for Campus Ambassador
+import roster_snapshot
+from bloom_filter import BloomFilter
+from email_canonical import canonical_email, rules_fingerprint
+from fuzzy_match import ID_BITS, MAX_DISTANCE, MAX_EXPANDED_LENGTH, SuggestionIndex
+from programs import PROGRAM_TABLE
+from roster_sources import iter_source_emails, resolve_source
 
-EXCEL_6 = './Excel-Sheets/CA_wob.xlsx'  
-EXCEL_7 = './Excel-Sheets/MENTORS_wob.xlsx'  
-EXCEL_8 = './Excel-Sheets/contributors_wob.xlsx'  
-EXCEL_9 = './Excel-Sheets/PA_wob.xlsx'
+# Role names in the order they are reported back to users
+ROLE_NAMES = PROGRAM_TABLE['role_names']
 
-def load_excel_data():
-    data = {}
+ROLE_ORDER = {name: position for position, name in enumerate(ROLE_NAMES)}
 
-    ca_emails = pd.read_excel(EXCEL_2, usecols=["email"])['email'].str.lower().values
-    ca_emails_extended = pd.read_excel(EXCEL_5, usecols=["email"])['email'].str.lower().values
-    
-    data['Campus Ambassador'] = list(ca_emails) + list(ca_emails_extended)  # Merge the two lists
-    data['CA | Wob'] = pd.read_excel(EXCEL_6, usecols=["email"])['email'].str.lower().values
+def normalize_email(email):
+    return email.strip().lower()
 
-    
-    data['Contributor'] = pd.read_excel(EXCEL_1, usecols=["email"])['email'].str.lower().values
-    data['Contributor | Wob'] = pd.read_excel(EXCEL_8, usecols=["email"])['email'].str.lower().values
+# (role name, roster source) pairs from programs.json; a role may be fed by
+# more than one source
+SHEETS = PROGRAM_TABLE['sheets']
 
-    data['Mentor'] = pd.read_excel(EXCEL_3, usecols=["email"])['email'].str.lower().values
-    data['Mentor | Wob'] = pd.read_excel(EXCEL_7, usecols=["email"])['email'].str.lower().values
-    
-    data['Project Admin'] = pd.read_excel(EXCEL_4, usecols=["email"])['email'].str.lower().values
-    data['PA | Wob'] = pd.read_excel(EXCEL_9, usecols=["email"])['email'].str.lower().values
+# Target false positive rate of the filter in front of the index
+FILTER_ERROR_RATE = float(os.getenv('ROSTER_FILTER_ERROR_RATE', '0.001'))
 
-    return data
+# Compiled copy of the sheets, rebuilt per sheet when a sheet changes
+SNAPSHOT_PATH = './Excel-Sheets/roster.snapshot'
+
+# Email filter and suggestion index of the last roster loaded from the snapshot
+LOOKUPS_PATH = './Excel-Sheets/roster.snapshot.lookups'
+
+# Worker processes start from a fresh interpreter instead of a fork: the bot
+# already runs the state store, flusher and watchdog threads, and a forked
+# copy of a lock one of them held would deadlock the child
+POOL_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+def iter_sheet_emails(path):
+    """Yield the normalized emails of the roster source at ``path``.
+
+    Rows are streamed from the reader picked by the file extension and
+    normalized as they arrive, without building a DataFrame.
+    """
+    for value in iter_source_emails(path):
+        # Blank and non-text cells are not emails
+        if isinstance(value, str):
+            email = normalize_email(value)
+            if email:
+                yield email
+
+def read_sheet_emails(path):
+    return list(iter_sheet_emails(path))
+
+def _parse_sheet_measured(path, trace_memory=False):
+    stats = {}
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        # One joined string pickles far smaller and faster than a list of strings
+        block = '\n'.join(iter_sheet_emails(path))
+        stats['seconds'] = time.perf_counter() - start
+        if trace_memory:
+            stats['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return block, stats
+
+def parse_sheets(paths, sheet_stats=None, workers=None, trace_memory=False):
+    """Parse ``paths`` across a process pool and return ``{path: emails}``.
+
+    openpyxl is pure Python, so sheets only load in parallel in separate
+    processes. Parse time and row count of each sheet are written into
+    ``sheet_stats``; with ``trace_memory`` the peak memory allocated while
+    parsing is recorded too, at the cost of a several times slower parse.
+    """
+    paths = list(paths)
+    workers = min(len(paths), workers or os.cpu_count() or 1)
+    flags = [trace_memory] * len(paths)
+    if workers <= 1:
+        results = list(map(_parse_sheet_measured, paths, flags))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=POOL_CONTEXT) as pool:
+            results = list(pool.map(_parse_sheet_measured, paths, flags))
+
+    parsed = {}
+    for path, (block, stats) in zip(paths, results):
+        parsed[path] = block.split('\n') if block else []
+        if sheet_stats is not None:
+            sheet_stats[path] = dict(stats, rows=len(parsed[path]))
+    return parsed
+
+def load_excel_data(sheets=SHEETS, snapshot_path=SNAPSHOT_PATH, sheet_stats=None, workers=None,
+                    trace_memory=False, collisions=None):
+    # Each configured sheet may have been exported as CSV, Parquet or JSONL
+    sheets = [(role_name, resolve_source(path)) for role_name, path in sheets]
+    paths = list(dict.fromkeys(path for _, path in sheets))
+    parse = lambda stale_paths: parse_sheets(stale_paths, sheet_stats, workers, trace_memory)
+    if snapshot_path:
+        emails_by_sheet = roster_snapshot.load_sheets(paths, parse, snapshot_path, canonical_email,
+                                                      rules_fingerprint())
+    else:
+        emails_by_sheet = {path: (emails, None) for path, emails in parse(paths).items()}
+
+    return index_normalized_emails(((role_name, *emails_by_sheet[path]) for role_name, path in sheets),
+                                   collisions)
+
+def build_roster_index(data):
+    """Compile ``{role_name: emails}`` into ``{canonical_email: frozenset(role_names)}``.
+
+    Every email with the same combination of roles shares one frozenset, so
+    the index costs one dict slot per registrant and a lookup is one probe.
+    """
+    return index_normalized_emails(
+        (role_name, [normalize_email(email) for email in emails if isinstance(email, str)], None)
+        for role_name, emails in data.items()
+    )
+
+def index_normalized_emails(role_emails, collisions=None):
+    """Build the lookup index from ``(role_name, emails, canonicals)`` triples
+    whose emails are already normalized, as stored in the roster snapshot.
+
+    Index keys are canonical emails, taken from ``canonicals`` (the snapshot
+    keeps them) or computed once here when it is None, so queries only
+    canonicalize their own input. Distinct roster spellings that share a
+    canonical form are written into ``collisions`` as
+    ``{canonical: {spelling: set(role_names)}}``.
+    """
+    index = {}
+    single_role_sets = {}
+    merged_role_sets = {}
+    # Spellings per canonical email, kept only once a non-canonical spelling shows up
+    spellings = {}
+    for role_name, emails, canonicals in role_emails:
+        role_set = single_role_sets.setdefault(role_name, frozenset((role_name,)))
+        if canonicals is None:
+            canonicals = map(canonical_email, emails)
+        for email, canonical in zip(emails, canonicals):
+            if not email:
+                continue
+            variants = spellings.get(canonical)
+            if variants is None and canonical != email:
+                variants = spellings[canonical] = {}
+                if canonical in index:
+                    # Every earlier row for this key was spelled canonically
+                    variants[canonical] = set(index[canonical])
+            if variants is not None:
+                variants.setdefault(email, set()).add(role_name)
+
+            current = index.get(canonical)
+            if current is None:
+                index[canonical] = role_set
+            elif role_name not in current:
+                key = (current, role_name)
+                merged = merged_role_sets.get(key)
+                if merged is None:
+                    merged = merged_role_sets[key] = current | role_set
+                index[canonical] = merged
+
+    if collisions is not None:
+        collisions.update((canonical, variants) for canonical, variants in spellings.items() if len(variants) > 1)
+    return index
+
+def build_email_filter(index, error_rate=FILTER_ERROR_RATE):
+    """Bloom filter over every email in ``index``, used to turn away unknown
+    emails before they reach the exact index."""
+    return BloomFilter.from_items(index, error_rate=error_rate)
+
+def build_suggestion_index(index):
+    """Typo-tolerant index over every email in ``index`` for "did you mean".
+
+    Built in a worker process: sorting the packed keys is one long call that
+    holds the GIL, and would stall the event loop even from a thread.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=POOL_CONTEXT) as pool:
+        return pool.submit(SuggestionIndex, list(index)).result()
+
+def load_lookups(index, lookups_path=LOOKUPS_PATH, error_rate=FILTER_ERROR_RATE):
+    """Return ``(email_filter, suggestion_index)`` for ``index``.
+
+    Both only depend on the index keys, so they are cached on disk behind a
+    digest of the keys and reused while the roster is unchanged; otherwise
+    they are built and the cache rewritten.
+    """
+    if not lookups_path:
+        return build_email_filter(index, error_rate), build_suggestion_index(index)
+    digest = hashlib.sha256()
+    # Build settings too, so a cache written under other ones is not reused
+    digest.update(repr((error_rate, ID_BITS, MAX_EXPANDED_LENGTH)).encode('utf-8'))
+    digest.update('\n'.join(index).encode('utf-8'))
+    digest = digest.hexdigest()
+
+    lookups = roster_snapshot.read_lookups(lookups_path, digest)
+    if lookups is not None:
+        return lookups
+    lookups = build_email_filter(index, error_rate), build_suggestion_index(index)
+    try:
+        roster_snapshot.write_lookups(lookups_path, digest, lookups)
+    except OSError as e:
+        print(f"Failed to write roster lookups {lookups_path}: {e}")
+    return lookups
+
+def suggest_emails(email, suggestion_index, max_distance=MAX_DISTANCE, limit=1):
+    """Closest roster emails to ``email`` within ``max_distance`` edits."""
+    if suggestion_index is None:
+        return []
+    return [match for _, match in suggestion_index.suggest(canonical_email(email), max_distance, limit)]
 
 # Function to find roles based on the preloaded data
-def get_roles_for_email(email, excel_data):
-    email = email.lower()  # Convert the passed email to lowercase for comparison
-    roles = []
-    for role_name, emails in excel_data.items():
-        if email in emails:
-            roles.append(role_name)
-    return roles
+def get_roles_for_email(email, excel_data, email_filter=None):
+    email = canonical_email(email)
+    if email_filter is not None:
+        if email not in email_filter:
+            email_filter.rejected += 1
+            return []
+        email_filter.passed += 1
+
+    role_names = excel_data.get(email)
+    if not role_names:
+        if email_filter is not None:
+            email_filter.false_positives += 1
+        return []
+    return sorted(role_names, key=lambda name: ROLE_ORDER.get(name, len(ROLE_ORDER)))
+
+def diff_roster(old_index, new_index):
+    """Return ``{role_name: (added, removed)}`` row counts between two indexes."""
+    added = dict.fromkeys(ROLE_NAMES, 0)
+    removed = dict.fromkeys(ROLE_NAMES, 0)
+    empty = frozenset()
+
+    for email, role_names in new_index.items():
+        old_role_names = old_index.get(email, empty)
+        if role_names != old_role_names:
+            for role_name in role_names - old_role_names:
+                added[role_name] = added.get(role_name, 0) + 1
+            for role_name in old_role_names - role_names:
+                removed[role_name] = removed.get(role_name, 0) + 1
+
+    for email, old_role_names in old_index.items():
+        if email not in new_index:
+            for role_name in old_role_names:
+                removed[role_name] = removed.get(role_name, 0) + 1
+
+    return {role_name: (added[role_name], removed[role_name]) for role_name in added}
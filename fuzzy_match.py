@@ -0,0 +1,160 @@
+from array import array
+from bisect import bisect_left
+import zlib
+
+# Typo-tolerant lookup over the roster, used to answer failed /verify calls
+# with "did you mean ...". It is a symmetric deletion index: every roster
+# email is filed under each variant of its local part with one character
+# removed, so two emails one edit apart (a wrong, missing or extra character,
+# or two adjacent characters swapped) always share a key. Two independent
+# edits need deletions of depth two on both sides, which for a 13-character
+# local part is ~90 keys per email instead of ~14, so the index stops at one.
+# Queries only probe the keys their own deletions produce and confirm
+# candidates with a banded edit distance, never scanning the roster.
+#
+# Keys are stored as one sorted array of 64-bit integers, the top bits a hash
+# of the key and the low bits the email's position, which keeps the index at
+# 8 bytes per key instead of a dict entry and a string per key.
+
+ID_BITS = 24
+ID_MASK = (1 << ID_BITS) - 1
+HASH_MASK = ((1 << 64) - 1) ^ ID_MASK
+
+# Local parts longer than this are only expanded over their first characters
+MAX_EXPANDED_LENGTH = 32
+
+# Edits the deletion index is guaranteed to bridge
+MAX_DISTANCE = 1
+
+def _deletions(word):
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+def _key_hash(key):
+    # Not hash(): that is salted per process, and the index is built in a
+    # worker process. A CRC collision only adds a candidate to re-check
+    return zlib.crc32(key.encode()) << ID_BITS
+
+def edit_distance(a, b, max_distance):
+    """Optimal string alignment distance between ``a`` and ``b`` (adjacent
+    transpositions count as one edit), or ``max_distance + 1`` once it is
+    known to exceed ``max_distance``."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    # Roster candidates share most of their characters with the query, so
+    # trimming the common prefix and suffix leaves only a few cells of DP
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return min(max(len(a), len(b)), max_distance + 1)
+
+    too_far = max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [too_far] * len(b)
+        # Cells further than max_distance from the diagonal cannot be in range
+        for j in range(max(1, i - max_distance), min(len(b), i + max_distance) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+        if min(current) > max_distance:
+            return too_far
+        previous_previous, previous = previous, current
+    return min(previous[len(b)], too_far)
+
+class SuggestionIndex:
+    def __init__(self, emails):
+        self.emails = []
+        self.domains = {}
+        packed = []
+
+        for email in emails:
+            local, at, domain = email.rpartition('@')
+            if not at:
+                continue
+            email_id = len(self.emails)
+            if email_id > ID_MASK:
+                break
+            self.emails.append(email)
+            self.domains.setdefault(domain, None)
+            suffix = f"@{domain}"
+            for key in _deletions(local[:MAX_EXPANDED_LENGTH]):
+                packed.append(_key_hash(key + suffix) | email_id)
+
+        packed.sort()
+        self.keys = array('Q', packed)
+
+        # Few distinct domains, so a plain dict of their deletions is enough
+        self.domain_buckets = {}
+        for domain in self.domains:
+            for key in _deletions(domain):
+                self.domain_buckets.setdefault(key, []).append(domain)
+
+    def _candidates(self, key):
+        keys = self.keys
+        key_hash = _key_hash(key)
+        position = bisect_left(keys, key_hash)
+        while position < len(keys) and keys[position] & HASH_MASK == key_hash:
+            yield self.emails[keys[position] & ID_MASK]
+            position += 1
+
+    def suggest(self, email, max_distance=MAX_DISTANCE, limit=3):
+        """Return up to ``limit`` ``(distance, roster_email)`` pairs within
+        ``max_distance`` edits of ``email`` (a canonical email), closest first.
+
+        Matches further than ``MAX_DISTANCE`` are never found by the index,
+        so a larger ``max_distance`` only loosens the final check.
+        """
+        local, at, domain = email.rpartition('@')
+        if not at:
+            return []
+
+        # The domain may carry a typo of its own ("gmial.com")
+        domains = {domain} if domain in self.domains else set()
+        for key in _deletions(domain):
+            for candidate in self.domain_buckets.get(key, ()):
+                if edit_distance(domain, candidate, 1) <= 1:
+                    domains.add(candidate)
+
+        matches = {}
+        local_deletions = _deletions(local[:MAX_EXPANDED_LENGTH])
+        for candidate_domain in domains:
+            suffix = f"@{candidate_domain}"
+            # A corrected domain is one edit on top of the local part's
+            allowed = max_distance + (candidate_domain != domain)
+            for key in local_deletions:
+                for candidate in self._candidates(key + suffix):
+                    if candidate not in matches and candidate != email:
+                        distance = edit_distance(email, candidate, allowed)
+                        if distance <= allowed:
+                            matches[candidate] = distance
+
+        return sorted((distance, candidate) for candidate, distance in matches.items())[:limit]
+
+    def stats(self):
+        return {
+            'emails': len(self.emails),
+            'keys': len(self.keys),
+            'domains': len(self.domains),
+            'bytes': self.keys.itemsize * len(self.keys),
+        }
+
+def mask_email(email):
+    """Hide most of the local part so a suggestion does not leak an address."""
+    local, at, domain = email.rpartition('@')
+    if not at:
+        return '*' * len(email)
+    if len(local) <= 2:
+        masked = local[0] + '*' * (len(local) - 1)
+    else:
+        masked = local[0] + '*' * (len(local) - 2) + local[-1]
+    return f"{masked}@{domain}"
@@ -0,0 +1,210 @@
+import asyncio
+import csv
+import io
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+import discord
+from dotenv import load_dotenv
+from state_store import store
+from Verification_Module.work_queue import verification_queue
+
+load_dotenv()
+
+# Most items one job works on at the same time
+JOB_CONCURRENCY = int(os.getenv('JOB_CONCURRENCY', '4'))
+
+# Seconds between edits of a job's status message
+STATUS_INTERVAL = 5
+
+# Items finished without a 429 before a throttled job gets a worker back
+RAMP_UP_ITEMS = 50
+
+class JobKind:
+    """A kind of bulk member job: how one item is processed and reported.
+
+    ``handler(guild, bot_data, job, item)`` returns ``(result, detail)``;
+    ``labels`` maps results to the names shown in the status message, and
+    ``failures`` lists the results broken down by reason at the end.
+    ``routes`` are the REST route markers whose rate limits pause the job.
+    """
+
+    def __init__(self, name, title, handler, labels, failures=('failed',), concurrency=JOB_CONCURRENCY,
+                 report_columns=(), routes=('/members/',)):
+        self.name = name
+        self.title = title
+        self.handler = handler
+        self.labels = dict(labels, failed=labels.get('failed', "Failed"), pending="Pending")
+        self.failures = tuple(failures) if 'failed' in failures else tuple(failures) + ('failed',)
+        self.concurrency = max(1, concurrency)
+        self.report_columns = tuple(report_columns)
+        self.routes = tuple(routes)
+
+KINDS = {}
+
+# Job ID -> task, so a reconnect does not start a job twice
+_running = {}
+_cancel_requested = set()
+
+def register_kind(kind):
+    KINDS[kind.name] = kind
+    return kind
+
+def is_running(job_id):
+    return job_id in _running and not _running[job_id].done()
+
+def _route_hits(routes):
+    hits = verification_queue.rate_limits.hits
+    return sum(count for route, count in hits.items() if any(marker in route for marker in routes))
+
+def status_embed(job, counts, state='running', failures=()):
+    kind = KINDS[job['kind']]
+    total = sum(counts.values())
+    done = total - counts.get('pending', 0)
+    headline = {'running': "Processing", 'finished': "Finished", 'cancelled': "Cancelled"}.get(state, state)
+    embed = discord.Embed(
+        title=f"{kind.title} #{job['id']}",
+        description=f"{headline}: {done} / {total} items",
+        color={'finished': discord.Color.green(), 'cancelled': discord.Color.orange()}.get(state, discord.Color.blurple()),
+        timestamp=discord.utils.utcnow()
+    )
+    for result, label in kind.labels.items():
+        if counts.get(result):
+            embed.add_field(name=label, value=str(counts[result]), inline=True)
+    if failures:
+        embed.add_field(
+            name="Failure reasons",
+            value="\n".join(f"{count} x {kind.labels.get(result, result)}: {(detail or 'no detail')[:80]}"
+                            for result, detail, count in failures),
+            inline=False
+        )
+    embed.add_field(name="Started by", value=f"<@{job['requested_by']}>", inline=False)
+    return embed
+
+async def build_report(job):
+    kind = KINDS[job['kind']]
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['target_id', *kind.report_columns, 'result', 'detail'])
+    for item in await store.get_job_items(job['id']):
+        writer.writerow([item['target_id'] or '', *(item['payload'].get(column, '') for column in kind.report_columns),
+                         item['result'] or 'pending', item['detail'] or ''])
+    return discord.File(io.BytesIO(output.getvalue().encode('utf-8')), filename=f"{kind.name}-{job['id']}.csv")
+
+async def create_job(bot, bot_data, kind_name, channel, requested_by, items, params=None):
+    """Persist a job, post its status message in ``channel`` and start it."""
+    job_id = await store.create_job(kind_name, channel.guild.id, channel.id, requested_by, items,
+                                    datetime.now(timezone.utc).isoformat(), params)
+    job = await store.get_job(job_id)
+    status_message = await channel.send(embed=status_embed(job, await store.job_result_counts(job_id)))
+    await store.set_job_message(job_id, status_message.id)
+    job['message_id'] = status_message.id
+    start_job(bot, bot_data, job)
+    return job, status_message
+
+async def run_job(bot, bot_data, job):
+    kind = KINDS[job['kind']]
+    guild = bot.get_guild(job['guild_id'])
+    channel = bot.get_channel(job['channel_id'])
+    status_message = channel.get_partial_message(job['message_id']) if channel and job['message_id'] else None
+    if guild is None:
+        print(f"{kind.title} #{job['id']}: guild {job['guild_id']} not found")
+        return
+
+    pending = deque(await store.get_job_items(job['id'], pending_only=True))
+    counts = await store.job_result_counts(job['id'])
+    # Workers allowed to run; one is taken away on each 429 and given back
+    # after a stretch without one, so the job settles below the route's bucket
+    throttle = {'limit': kind.concurrency, 'hits': _route_hits(kind.routes), 'clean': 0}
+
+    async def worker(index):
+        while True:
+            # Wait for a slot before taking an item, so a worker parked by the
+            # throttle never holds one back from the workers still running
+            while index >= throttle['limit'] and pending and job['id'] not in _cancel_requested:
+                await asyncio.sleep(1)
+            if not pending or job['id'] in _cancel_requested:
+                return
+            item = pending.popleft()
+            delay = verification_queue.rate_limits.retry_after(kind.routes)
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                result, detail = await kind.handler(guild, bot_data, job, item)
+            except discord.HTTPException as e:
+                result, detail = 'failed', f"{e.status} {e.text or type(e).__name__}"
+            except Exception as e:
+                result, detail = 'failed', f"{type(e).__name__}: {e}"
+            await store.record_job_item(job['id'], item['item'], result, detail)
+            counts['pending'] -= 1
+            counts[result] = counts.get(result, 0) + 1
+
+            hits = _route_hits(kind.routes)
+            if hits > throttle['hits']:
+                throttle['hits'] = hits
+                throttle['clean'] = 0
+                throttle['limit'] = max(1, throttle['limit'] - 1)
+            else:
+                throttle['clean'] += 1
+                if throttle['clean'] >= RAMP_UP_ITEMS and throttle['limit'] < kind.concurrency:
+                    throttle['clean'] = 0
+                    throttle['limit'] += 1
+
+    async def report_progress():
+        while True:
+            await asyncio.sleep(STATUS_INTERVAL)
+            if status_message:
+                try:
+                    await status_message.edit(embed=status_embed(job, counts))
+                except discord.HTTPException as e:
+                    print(f"Could not update {kind.title} #{job['id']} status: {e}")
+
+    progress = asyncio.create_task(report_progress())
+    try:
+        await asyncio.gather(*(worker(index) for index in range(kind.concurrency)))
+    finally:
+        progress.cancel()
+
+    state = 'cancelled' if job['id'] in _cancel_requested else 'finished'
+    _cancel_requested.discard(job['id'])
+    await store.finish_job(job['id'], state, datetime.now(timezone.utc).isoformat())
+    counts = await store.job_result_counts(job['id'])
+    failures = await store.job_failure_details(job['id'], kind.failures)
+    print(f"{kind.title} #{job['id']} {state}: {counts}")
+    if status_message:
+        await status_message.edit(embed=status_embed(job, counts, state, failures),
+                                  attachments=[await build_report(job)])
+
+def start_job(bot, bot_data, job):
+    if is_running(job['id']):
+        return
+    started = time.monotonic()
+    task = asyncio.create_task(run_job(bot, bot_data, job))
+
+    def finished(task):
+        if not task.cancelled() and task.exception():
+            print(f"Job #{job['id']} ({job['kind']}) stopped after {time.monotonic() - started:.0f}s: "
+                  f"{task.exception()!r}")
+    task.add_done_callback(finished)
+    _running[job['id']] = task
+
+async def cancel_job(job_id):
+    """Stop a running job after the items in flight; returns False if it is not running."""
+    job = await store.get_job(job_id)
+    if job is None or job['state'] != 'running':
+        return False
+    if is_running(job_id):
+        _cancel_requested.add(job_id)
+    else:
+        # Not started in this process (e.g. its kind is no longer loaded)
+        await store.finish_job(job_id, 'cancelled', datetime.now(timezone.utc).isoformat())
+    return True
+
+async def resume_jobs(bot, bot_data):
+    """Restart every job that was running when the bot stopped."""
+    jobs = [job for job in await store.running_jobs() if job['kind'] in KINDS]
+    for job in jobs:
+        print(f"Resuming {KINDS[job['kind']].title} #{job['id']}")
+        start_job(bot, bot_data, job)
+    return len(jobs)
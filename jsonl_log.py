@@ -0,0 +1,25 @@
+import json
+import os
+
+# Append-only, line-delimited JSON logs: one entry per line, so writing an
+# entry never reads or rewrites the entries before it.
+
+def append_jsonl(path, entry):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + '\n')
+
+def read_jsonl(path):
+    entries = []
+    if not os.path.exists(path):
+        return entries
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A crash mid-append can leave a torn last line
+                print(f"Skipping malformed line in {path}")
+    return entries
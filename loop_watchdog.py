@@ -0,0 +1,133 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+import discord
+from discord.ext import tasks
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Event loop lag above this many milliseconds counts as a stall
+LAG_THRESHOLD_MS = float(os.getenv('LOOP_LAG_THRESHOLD_MS', '250'))
+
+# At most one stall report per this many seconds goes to the log channel
+REPORT_INTERVAL = int(os.getenv('LOOP_LAG_REPORT_SECONDS', '300'))
+
+# How often the loop is sampled, and how many samples the percentiles cover
+SAMPLE_SECONDS = 0.1
+SAMPLE_WINDOW = 3000
+
+# Innermost frames kept from a captured stack
+STACK_FRAMES = 12
+
+class LoopWatchdog:
+    """Measures event loop lag and captures the stack of whatever blocks it.
+
+    A task on the loop sleeps ``SAMPLE_SECONDS`` at a time and records how
+    late it wakes up. A separate thread watches that task's heartbeat; once
+    it is overdue by more than the threshold the loop is stuck in
+    synchronous code, and the thread snapshots the loop thread's stack
+    while the blocking call is still on it.
+    """
+
+    def __init__(self, threshold_ms=LAG_THRESHOLD_MS, interval=SAMPLE_SECONDS, window=SAMPLE_WINDOW):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self.samples = deque(maxlen=window)
+        self.stalls = deque(maxlen=100)
+        self.stall_count = 0
+        self._heartbeat = time.monotonic()
+        self._captured_stack = None
+        self._loop_thread_id = None
+        self._task = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start sampling the running event loop."""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        threading.Thread(target=self._monitor, name='loop-watchdog', daemon=True).start()
+
+    async def _sample(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - expected)
+            previous_heartbeat, self._heartbeat = self._heartbeat, time.monotonic()
+            self.samples.append(lag)
+            if lag > self.threshold:
+                self._record_stall(lag, previous_heartbeat)
+
+    def _record_stall(self, lag, heartbeat):
+        captured, self._captured_stack = self._captured_stack, None
+        # Only a stack taken during this stall belongs to it
+        stack = captured[1] if captured and captured[0] == heartbeat else None
+        self.stall_count += 1
+        self.stalls.append({
+            'lag': lag,
+            'time': discord.utils.utcnow(),
+            'stack': stack,
+        })
+        print(f"Event loop blocked for {lag * 1000:.0f}ms" + (f" in:\n{stack}" if stack else ""))
+
+    def _monitor(self):
+        while self.running:
+            time.sleep(self.interval / 2)
+            heartbeat = self._heartbeat
+            overdue = time.monotonic() - heartbeat - self.interval
+            captured = self._captured_stack
+            # Snapshot halfway to the threshold so short stalls are still caught;
+            # it is only reported if the stall goes on to cross the threshold
+            if overdue > self.threshold / 2 and (captured is None or captured[0] != heartbeat):
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    # Last frames are the blocking call; the rest is asyncio plumbing
+                    self._captured_stack = (heartbeat, ''.join(traceback.format_stack(frame)[-STACK_FRAMES:]))
+
+    def percentiles(self):
+        """Lag in milliseconds at p50, p95, p99 and the max over the window."""
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+        at = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+        return {'p50': at(0.50), 'p95': at(0.95), 'p99': at(0.99), 'max': ordered[-1] * 1000}
+
+    def take_stalls(self):
+        stalls = list(self.stalls)
+        self.stalls.clear()
+        return stalls
+
+watchdog = LoopWatchdog()
+
+def format_percentiles(percentiles):
+    return " / ".join(f"{name} {value:.1f}ms" for name, value in percentiles.items())
+
+@tasks.loop(seconds=REPORT_INTERVAL)
+async def report_stalls(bot):
+    # Rate limited: one embed per interval with the worst stall since the last one
+    stalls = watchdog.take_stalls()
+    log_channel_id = int(os.getenv('LOG_CHANNEL_ID', 0))
+    log_channel = bot.get_channel(log_channel_id) if log_channel_id else None
+    if not stalls or not log_channel:
+        return
+
+    worst = max(stalls, key=lambda stall: stall['lag'])
+    embed = discord.Embed(
+        title="Event Loop Blocked",
+        description=f"Blocked for {worst['lag'] * 1000:.0f}ms at <t:{int(worst['time'].timestamp())}:T>"
+                    + (f", plus {len(stalls) - 1} more stall(s) since the last report" if len(stalls) > 1 else ""),
+        color=discord.Color.orange(),
+        timestamp=discord.utils.utcnow()
+    )
+    stack = worst['stack'] or "Not captured (the stall ended before the watchdog looked)"
+    embed.add_field(name="Blocking stack", value=f"```\n{stack[-1000:]}\n```", inline=False)
+    embed.add_field(name="Loop lag", value=format_percentiles(watchdog.percentiles()), inline=False)
+    await log_channel.send(embed=embed)
@@ -0,0 +1,60 @@
+import re
+from programs import PROGRAM_TABLE
+
+# Discord rejects nicknames longer than this
+NICKNAME_LIMIT = 32
+
+class NicknameFormatter:
+    """Builds the "<name> | <role>" nicknames given on verification.
+
+    Every role suffix and alias from the program table is folded into one
+    regex compiled up front, which removes old suffixes ("Alice | CA",
+    "Alice|Mentor") and role words standing alone ("CA Alice") in a single
+    pass. Over-long nicknames are shortened by one policy: use the role's
+    full suffix if it fits, else its short suffix, else cut the name.
+    """
+
+    def __init__(self, table=PROGRAM_TABLE, limit=NICKNAME_LIMIT):
+        self.limit = limit
+        self.roles = table['roles']
+        self.priority = table['priority']
+        # Tokens are sorted longest first, so 'CA | WoB' wins over 'CA'
+        tokens = '|'.join(re.escape(token) for token in table['nickname_tokens'])
+        # A token counts only as a whole word: bounded by whitespace, a pipe or the ends
+        self._role_tokens = re.compile(rf'(?:\s*\|\s*|(?<![^\s|]))(?:{tokens})(?![^\s|])')
+        self._spaces = re.compile(r'\s{2,}')
+
+    def strip_roles(self, display_name):
+        """``display_name`` without any role suffix or standalone role word."""
+        name = self._role_tokens.sub('', display_name)
+        return self._spaces.sub(' ', name).strip(' |')
+
+    def highest_role(self, role_names):
+        for role_name in self.priority:
+            if role_name in role_names:
+                return role_name
+        return None
+
+    def format(self, display_name, role_name, fallback=''):
+        """Nickname for a member shown as ``display_name`` verified as ``role_name``.
+
+        ``fallback`` (usually the username) is used when nothing is left of
+        the display name once role words are removed.
+        """
+        name = self.strip_roles(display_name) or self.strip_roles(fallback)
+        role = self.roles[role_name]
+        suffixes = [role['nickname']]
+        if role['short_nickname']:
+            suffixes.append(role['short_nickname'])
+
+        while name:
+            for suffix in suffixes:
+                nickname = f"{name} | {suffix}"
+                if len(nickname) <= self.limit:
+                    return nickname
+            # Even the shortest suffix does not fit: cut the name to make room.
+            # The cut can expose a role word ("Bob | Contributors"), so strip again
+            name = self.strip_roles(name[:max(0, self.limit - len(suffix) - 3)])
+        return suffixes[-1][:self.limit]
+
+nickname_formatter = NicknameFormatter()
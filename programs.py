@@ -0,0 +1,80 @@
+import json
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Declarative table of every program and role the bot verifies against.
+# Adding a program round is one more entry in this file, no code changes.
+PROGRAMS_FILE = os.getenv('PROGRAMS_FILE', 'programs.json')
+
+def load_programs(path=PROGRAMS_FILE):
+    """Compile the program definition file into the tables the bot uses.
+
+    Returns a dict with:
+      programs          {program_key: {"title": ...}}
+      roles             {role_name: role definition}, in file order
+      role_names        role names in file order, the order shown to users
+      priority          role names from highest to lowest priority
+      sheets            (role_name, source_path) pairs for the roster loader
+      nickname_tokens   every suffix or alias stripped from display names
+    """
+    with open(path, 'r') as f:
+        config = json.load(f)
+
+    programs = config.get('programs', {})
+    roles = {}
+    for role in config['roles']:
+        name = role['name']
+        if name in roles:
+            raise ValueError(f"{path}: role '{name}' is defined twice")
+        if role.get('program') not in programs:
+            raise ValueError(f"{path}: role '{name}' refers to unknown program '{role.get('program')}'")
+        if 'role_id' not in role and 'role_id_env' not in role:
+            raise ValueError(f"{path}: role '{name}' needs a role_id or role_id_env")
+        roles[name] = {
+            'name': name,
+            'program': role['program'],
+            'sources': list(role.get('sources', [])),
+            'role_id': role.get('role_id'),
+            'role_id_env': role.get('role_id_env'),
+            'priority': role.get('priority', len(roles)),
+            'nickname': role.get('nickname', name),
+            'short_nickname': role.get('short_nickname'),
+        }
+
+    nickname_tokens = []
+    for role in roles.values():
+        nickname_tokens += [role['name'], role['nickname']]
+        if role['short_nickname']:
+            nickname_tokens.append(role['short_nickname'])
+    nickname_tokens += config.get('nickname_aliases', [])
+
+    return {
+        'programs': programs,
+        'roles': roles,
+        'role_names': tuple(roles),
+        'priority': sorted(roles, key=lambda name: roles[name]['priority']),
+        'sheets': tuple((name, path) for name, role in roles.items() for path in role['sources']),
+        # Longest first, so 'CA | Wob' is stripped before 'CA'
+        'nickname_tokens': sorted(dict.fromkeys(nickname_tokens), key=len, reverse=True),
+    }
+
+def resolve_role_ids(table):
+    """Map each role name to its Discord role ID.
+
+    IDs given as ``role_id_env`` are read from the environment here rather
+    than at import time, so call this after the .env file is loaded.
+    """
+    role_ids = {}
+    for name, role in table['roles'].items():
+        role_id = role['role_id']
+        if role_id is None:
+            value = os.getenv(role['role_id_env'])
+            if value is None:
+                raise ValueError(f"Environment variable {role['role_id_env']} for role '{name}' is not set")
+            role_id = value
+        role_ids[name] = int(role_id)
+    return role_ids
+
+PROGRAM_TABLE = load_programs()
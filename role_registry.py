@@ -0,0 +1,55 @@
+class RoleRegistry:
+    """Configured role names resolved to the guild's Role objects.
+
+    Built once from ``bot_data['role_ids']`` when the bot is ready and kept
+    current from the role create/update/delete events, so verification
+    looks a role up by name in one dict probe instead of scanning
+    ``guild.roles``.
+    """
+
+    def __init__(self, role_ids):
+        self.role_ids = dict(role_ids)
+        self._names_by_id = {}
+        for name, role_id in self.role_ids.items():
+            if role_id:
+                self._names_by_id.setdefault(role_id, []).append(name)
+        self._roles = {}
+
+    def resolve(self, guild):
+        """Resolve every configured role in ``guild``; returns the names of
+        roles that are not configured or no longer exist."""
+        self._roles = {}
+        missing = []
+        for name, role_id in self.role_ids.items():
+            role = guild.get_role(role_id) if role_id else None
+            if role is None:
+                missing.append(name)
+            else:
+                self._roles[name] = role
+        return missing
+
+    def get(self, name):
+        return self._roles.get(name)
+
+    def roles_for(self, names):
+        """Role objects for ``names``, skipping any that are not resolved."""
+        return [self._roles[name] for name in names if name in self._roles]
+
+    def __len__(self):
+        return len(self._roles)
+
+    # Event hooks; roles the bot was not configured with are ignored
+
+    def role_created(self, role):
+        for name in self._names_by_id.get(role.id, ()):
+            self._roles[name] = role
+
+    def role_updated(self, role):
+        self.role_created(role)
+
+    def role_deleted(self, role):
+        """Forget a deleted role; returns the configured names it backed."""
+        names = self._names_by_id.get(role.id, [])
+        for name in names:
+            self._roles.pop(name, None)
+        return names
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import time
+from discord.ext import tasks
+from dotenv import load_dotenv
+from excel_handler import SHEETS, diff_roster, load_excel_data, load_lookups
+from roster_sources import candidate_paths
+
+load_dotenv()
+
+# Seconds between checks of the roster sheets for changes
+WATCH_INTERVAL = int(os.getenv('ROSTER_WATCH_SECONDS', '30'))
+
+_reload_lock = asyncio.Lock()
+_loaded_signature = None
+_pending_signature = None
+
+def sheets_signature(sheets=SHEETS):
+    signature = []
+    # Every format a sheet could be exported as, so a new CSV is noticed too
+    paths = [candidate for _, path in sheets for candidate in candidate_paths(path)]
+    for path in dict.fromkeys(paths):
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+def _build_index(old_index, trace_memory):
+    signature = sheets_signature()
+    sheet_stats = {}
+    collisions = {}
+    new_index = load_excel_data(sheet_stats=sheet_stats, trace_memory=trace_memory, collisions=collisions)
+    email_filter, suggestions = load_lookups(new_index)
+    return (signature, new_index, email_filter, suggestions, collisions,
+            diff_roster(old_index, new_index), sheet_stats)
+
+async def reload_roster(bot_data, trace_memory=False):
+    """Re-read the roster sheets in a worker thread and swap the new index in.
+
+    The index is only published once it is fully built, with a single
+    assignment, so a concurrent ``/verify`` sees either the old or the new
+    roster. Returns ``(changes, sheet_stats, elapsed_seconds)`` where
+    ``changes`` maps each role to its ``(added, removed)`` row counts and
+    ``sheet_stats`` holds the parse time and rows of each sheet that had to be
+    re-parsed, plus its peak memory when ``trace_memory`` is set.
+    """
+    global _loaded_signature, _pending_signature
+
+    async with _reload_lock:
+        start = time.perf_counter()
+        old_index = bot_data.get('excel_data') or {}
+        signature, new_index, email_filter, suggestions, collisions, changes, sheet_stats = \
+            await asyncio.to_thread(_build_index, old_index, trace_memory)
+        # Filter first: between the two assignments a lookup answers exactly
+        # as either the old or the new roster would
+        bot_data['roster_filter'] = email_filter
+        bot_data['excel_data'] = new_index
+        bot_data['roster_suggestions'] = suggestions
+        bot_data['roster_collisions'] = collisions
+        _loaded_signature = _pending_signature = signature
+        return changes, sheet_stats, time.perf_counter() - start
+
+def format_changes(changes):
+    lines = [f"{role_name}: +{added} / -{removed}" for role_name, (added, removed) in changes.items()
+             if added or removed]
+    return "\n".join(lines) or "No changes"
+
+def format_sheet_stats(sheet_stats):
+    lines = []
+    for path, stats in sorted(sheet_stats.items(), key=lambda item: item[1]['seconds'], reverse=True):
+        line = f"{os.path.basename(path)}: {stats['rows']} rows, {stats['seconds']:.2f}s"
+        if 'peak_bytes' in stats:
+            line += f", peak {stats['peak_bytes'] / 1024 / 1024:.1f} MiB"
+        lines.append(line)
+    return "\n".join(lines) or "All sheets served from the snapshot"
+
+@tasks.loop(seconds=WATCH_INTERVAL)
+async def watch_roster(bot_data):
+    global _loaded_signature, _pending_signature
+
+    signature = await asyncio.to_thread(sheets_signature)
+    if signature == _loaded_signature:
+        return
+
+    # Wait for the sheets to stop changing so a half-copied file is not parsed
+    if signature != _pending_signature:
+        _pending_signature = signature
+        return
+
+    try:
+        changes, sheet_stats, elapsed = await reload_roster(bot_data)
+        print(f"Reloaded roster in {elapsed:.2f}s:\n{format_changes(changes)}\n{format_sheet_stats(sheet_stats)}")
+    except Exception as e:
+        # Keep serving the old roster and retry once the sheets change again
+        _loaded_signature = signature
+        print(f"Error reloading roster: {e}")
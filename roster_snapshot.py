@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import pickle
+import struct
+
+# Layout: MAGIC, a little-endian uint32 header length, a JSON header and then
+# one newline-joined UTF-8 block of normalized emails per sheet, followed by
+# one block of their canonical forms per sheet (an empty line where the
+# canonical form is the email itself).
+#
+# The header maps each sheet path to the mtime, size and sha256 of the file the
+# block was parsed from, plus where its blocks sit in the body.  A sheet whose
+# mtime and size are unchanged is trusted as-is; otherwise its hash decides
+# whether it has to be read again by its format's reader (openpyxl for xlsx).
+# Canonical blocks are only used while the header's email rules fingerprint
+# matches the rules in force.
+MAGIC = b'GSSOCROSTER1\n'
+HEADER_LENGTH = struct.Struct('<I')
+
+# The lookups built over the whole index (Bloom filter, suggestion index) are
+# pickled into a second file, behind a digest of the index they were built from
+LOOKUPS_MAGIC = b'GSSOCLOOKUPS1\n'
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_snapshot(snapshot_path, rules=None):
+    """Return ``{path: (meta, emails, canonicals)}`` for every sheet in the
+    snapshot, or an empty dict when the snapshot is missing or unreadable.
+    ``canonicals`` is None unless the blocks were written under ``rules``."""
+    if not os.path.exists(snapshot_path):
+        return {}
+    try:
+        with open(snapshot_path, 'rb') as f:
+            blob = f.read()
+        if not blob.startswith(MAGIC):
+            return {}
+        offset = len(MAGIC)
+        (header_length,) = HEADER_LENGTH.unpack_from(blob, offset)
+        offset += HEADER_LENGTH.size
+        header = json.loads(blob[offset:offset + header_length])
+        body = offset + header_length
+    except (OSError, struct.error, ValueError):
+        return {}
+
+    def block(start, length):
+        return blob[body + start:body + start + length].decode('utf-8')
+
+    sheets = {}
+    for path, meta in header['sheets'].items():
+        emails = block(meta['offset'], meta['length'])
+        emails = emails.split('\n') if emails else []
+        canonicals = None
+        if rules is not None and header.get('rules') == rules and 'canonical_offset' in meta:
+            # One line per email, so a single email spelled canonically is an empty block
+            lines = block(meta['canonical_offset'], meta['canonical_length']).split('\n')
+            canonicals = [canonical or email for email, canonical in zip(emails, lines)]
+        sheets[path] = (meta, emails, canonicals)
+    return sheets
+
+def write_snapshot(snapshot_path, sheets, rules=None):
+    """Write ``{path: (meta, emails, canonicals)}`` atomically next to the sheets."""
+    header = {'sheets': {}, 'rules': rules}
+    blocks = []
+    offset = 0
+    for path, (meta, emails, canonicals) in sheets.items():
+        block = '\n'.join(emails).encode('utf-8')
+        header['sheets'][path] = dict(meta, offset=offset, length=len(block), count=len(emails))
+        blocks.append(block)
+        offset += len(block)
+    for path, (meta, emails, canonicals) in sheets.items():
+        if canonicals is None:
+            continue
+        block = '\n'.join('' if canonical == email else canonical
+                          for email, canonical in zip(emails, canonicals)).encode('utf-8')
+        header['sheets'][path].update(canonical_offset=offset, canonical_length=len(block))
+        blocks.append(block)
+        offset += len(block)
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    tmp_path = f"{snapshot_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(HEADER_LENGTH.pack(len(header_bytes)))
+        f.write(header_bytes)
+        for block in blocks:
+            f.write(block)
+    os.replace(tmp_path, snapshot_path)
+
+def load_sheets(paths, parse_sheets, snapshot_path, canonicalize=None, rules=None):
+    """Return ``{path: (normalized_emails, canonicals)}`` for ``paths``.
+
+    Sheets that are unchanged since the snapshot was written are served from
+    it; the rest are handed to ``parse_sheets`` in one batch and the snapshot
+    is rewritten. With ``canonicalize``, each sheet's canonical emails are
+    served from the snapshot too when it was written under the same
+    ``rules``, and computed and stored otherwise; without it ``canonicals``
+    is None.
+    """
+    cached = read_snapshot(snapshot_path, rules)
+    sheets = {}
+    stale = []
+    dirty = False
+
+    for path in dict.fromkeys(paths):
+        stat = os.stat(path)
+        meta = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+        entry = cached.get(path)
+
+        if entry and entry[0]['mtime_ns'] == meta['mtime_ns'] and entry[0]['size'] == meta['size']:
+            meta['sha256'] = entry[0]['sha256']
+            sheets[path] = (meta, entry[1], entry[2])
+            continue
+
+        meta['sha256'] = file_sha256(path)
+        if entry and entry[0]['sha256'] == meta['sha256']:
+            # Touched but not edited, keep the parsed emails
+            sheets[path] = (meta, entry[1], entry[2])
+        else:
+            stale.append(path)
+            sheets[path] = (meta, None, None)
+        dirty = True
+
+    if stale:
+        print(f"Parsing roster sheets: {', '.join(stale)}")
+        for path, emails in parse_sheets(stale).items():
+            sheets[path] = (sheets[path][0], emails, None)
+
+    if canonicalize is not None:
+        for path, (meta, emails, canonicals) in sheets.items():
+            if canonicals is None:
+                sheets[path] = (meta, emails, [canonicalize(email) for email in emails])
+                dirty = True
+
+    if dirty or set(cached) != set(sheets):
+        try:
+            write_snapshot(snapshot_path, sheets, rules)
+        except OSError as e:
+            print(f"Failed to write roster snapshot {snapshot_path}: {e}")
+
+    return {path: (emails, canonicals) for path, (meta, emails, canonicals) in sheets.items()}
+
+def read_lookups(lookups_path, digest):
+    """Return the lookups pickled by ``write_lookups`` under ``digest``, or
+    None when the file is missing, unreadable or built from another index."""
+    try:
+        with open(lookups_path, 'rb') as f:
+            if f.readline() != LOOKUPS_MAGIC or f.readline().decode('ascii').strip() != digest:
+                return None
+            return pickle.load(f)
+    except (OSError, EOFError, ValueError, AttributeError, ImportError, pickle.UnpicklingError):
+        return None
+
+def write_lookups(lookups_path, digest, lookups):
+    """Pickle ``lookups`` atomically, tagged with the ``digest`` of their index."""
+    tmp_path = f"{lookups_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(LOOKUPS_MAGIC)
+        f.write(f"{digest}\n".encode('ascii'))
+        pickle.dump(lookups, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, lookups_path)
@@ -0,0 +1,82 @@
+import csv
+import json
+import os
+from openpyxl import load_workbook
+
+# Every roster source, whatever its format, carries the registrant's address
+# in a column (or JSONL key) named "email"; header matching ignores case.
+EMAIL_COLUMN = 'email'
+
+def _email_column_index(header, path):
+    columns = [str(value).strip().lower() if value is not None else '' for value in header]
+    if EMAIL_COLUMN not in columns:
+        raise ValueError(f"{path} has no '{EMAIL_COLUMN}' column")
+    return columns.index(EMAIL_COLUMN)
+
+def iter_xlsx_emails(path):
+    # Read-only mode streams rows from the XML instead of building the sheet
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        header = next(sheet.iter_rows(max_row=1, values_only=True), ())
+        column = _email_column_index(header, path) + 1
+        for (value,) in sheet.iter_rows(min_row=2, min_col=column, max_col=column, values_only=True):
+            yield value
+    finally:
+        workbook.close()
+
+def iter_csv_emails(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        column = _email_column_index(next(reader, ()), path)
+        for row in reader:
+            if len(row) > column:
+                yield row[column]
+
+def iter_jsonl_emails(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line).get(EMAIL_COLUMN)
+
+def iter_parquet_emails(path):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError(f"Reading {path} requires pyarrow: pip install pyarrow") from None
+
+    parquet_file = pq.ParquetFile(path)
+    column = parquet_file.schema_arrow.names[_email_column_index(parquet_file.schema_arrow.names, path)]
+    # Row group batches keep memory bounded to one batch of the email column
+    for batch in parquet_file.iter_batches(columns=[column]):
+        yield from batch.column(0).to_pylist()
+
+READERS = {
+    '.xlsx': iter_xlsx_emails,
+    '.csv': iter_csv_emails,
+    '.jsonl': iter_jsonl_emails,
+    '.parquet': iter_parquet_emails,
+}
+
+def iter_source_emails(path):
+    """Yield the raw email column of ``path`` using the reader for its extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in READERS:
+        raise ValueError(f"Unsupported roster format '{extension}' for {path}")
+    return READERS[extension](path)
+
+def candidate_paths(path):
+    """``path`` plus the same file name with every other supported extension."""
+    stem = os.path.splitext(path)[0]
+    return [path] + [stem + extension for extension in READERS if stem + extension != path]
+
+def resolve_source(path):
+    """Pick the newest existing export of the roster configured at ``path``.
+
+    Ops can drop ``contributor_Data.csv`` next to (or instead of)
+    ``contributor_Data.xlsx`` and the most recently modified one is used.
+    """
+    existing = [candidate for candidate in candidate_paths(path) if os.path.exists(candidate)]
+    if not existing:
+        return path
+    return max(existing, key=os.path.getmtime)
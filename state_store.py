@@ -0,0 +1,553 @@
+import asyncio
+import atexit
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from jsonl_log import read_jsonl
+
+load_dotenv()
+
+# Single SQLite database holding the bot's persistent state
+STATE_DB = os.getenv('STATE_DB', 'bot_state.db')
+
+# Buffered writes are committed every STATE_FLUSH_SECONDS, or as soon as
+# STATE_FLUSH_ROWS of them are waiting
+FLUSH_SECONDS = float(os.getenv('STATE_FLUSH_SECONDS', '2'))
+FLUSH_ROWS = int(os.getenv('STATE_FLUSH_ROWS', '200'))
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS warnings (
+    id INTEGER PRIMARY KEY,
+    guild_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    reason TEXT,
+    moderator TEXT,
+    timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS warnings_by_user ON warnings (guild_id, user_id);
+CREATE TABLE IF NOT EXISTS failed_attempts (
+    member_id TEXT PRIMARY KEY,
+    email TEXT
+);
+CREATE TABLE IF NOT EXISTS verifications (
+    id INTEGER PRIMARY KEY,
+    discord_id INTEGER NOT NULL,
+    discord_username TEXT,
+    email TEXT,
+    roles TEXT,
+    time TEXT
+);
+CREATE INDEX IF NOT EXISTS verifications_by_member ON verifications (discord_id);
+CREATE INDEX IF NOT EXISTS verifications_by_email ON verifications (email);
+CREATE TABLE IF NOT EXISTS username_updates (
+    id INTEGER PRIMARY KEY,
+    discord_id INTEGER NOT NULL,
+    discord_username TEXT,
+    email TEXT,
+    old_name TEXT,
+    new_name TEXT,
+    time TEXT
+);
+CREATE INDEX IF NOT EXISTS username_updates_by_member ON username_updates (discord_id);
+CREATE TABLE IF NOT EXISTS welcome_messages (
+    member_id INTEGER PRIMARY KEY,
+    message_id INTEGER NOT NULL,
+    timestamp TEXT
+);
+CREATE TABLE IF NOT EXISTS orphaned_welcome_messages (
+    message_id INTEGER PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS email_claims (
+    email TEXT NOT NULL,
+    discord_id INTEGER NOT NULL,
+    claimed TEXT,
+    PRIMARY KEY (email, discord_id)
+);
+CREATE INDEX IF NOT EXISTS email_claims_by_member ON email_claims (discord_id);
+CREATE TABLE IF NOT EXISTS verified_members (
+    discord_id INTEGER PRIMARY KEY,
+    email TEXT,
+    roles TEXT,
+    nickname TEXT,
+    verified TEXT
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    guild_id INTEGER,
+    channel_id INTEGER,
+    message_id INTEGER,
+    requested_by INTEGER,
+    state TEXT NOT NULL,
+    created TEXT,
+    finished TEXT,
+    params TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state);
+CREATE TABLE IF NOT EXISTS job_items (
+    job_id INTEGER NOT NULL,
+    item INTEGER NOT NULL,
+    target_id INTEGER,
+    payload TEXT,
+    result TEXT,
+    detail TEXT,
+    PRIMARY KEY (job_id, item)
+);
+'''
+
+# JSON files written by earlier versions of the bot, imported once
+LEGACY_FILES = {
+    'warnings': ['warnings.json'],
+    'failed_attempts': ['failed_attempts.json'],
+    'verifications': ['verification_loga.json', 'verification_log.jsonl'],
+    'username_updates': ['username_updates.json', 'username_updates.jsonl'],
+    'welcome_messages': ['welcome_messages.json'],
+}
+
+class StateStore:
+    """SQLite store in WAL mode for warnings, failed verification attempts,
+    verification and username logs, email claims, verified members, pending
+    welcome messages and the state of resumable jobs.
+
+    All queries run on one dedicated thread that owns the connection, so
+    callers on the event loop just await them and never block on disk I/O.
+
+    Log rows, failed attempts and welcome message changes are write-behind:
+    they are buffered in memory and committed in one transaction per
+    ``flush_seconds`` (sooner once ``flush_rows`` are waiting), so a join
+    surge costs one commit per interval instead of one per event. Reads
+    commit the buffer first and always see every earlier write. A crash
+    loses at most the buffered rows; a batch is never half-written.
+    """
+
+    def __init__(self, path=STATE_DB, flush_seconds=FLUSH_SECONDS, flush_rows=FLUSH_ROWS):
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self.flush_rows = max(1, flush_rows)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='state-store')
+        self._db = None
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._closed = False
+        self._flusher = None
+        self.flushes = 0
+        self.rows_flushed = 0
+
+    def _connection(self):
+        if self._db is None:
+            # Used from the store thread only, and by close() once that thread has exited
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.row_factory = sqlite3.Row
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.executescript(SCHEMA)
+            # Stores created before jobs had parameters
+            if 'params' not in {row['name'] for row in self._db.execute('PRAGMA table_info(jobs)')}:
+                self._db.execute('ALTER TABLE jobs ADD COLUMN params TEXT')
+        return self._db
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    def _execute(self, sql, params=()):
+        self._flush_pending()
+        db = self._connection()
+        with db:
+            return db.execute(sql, params).rowcount
+
+    def _query(self, sql, params=()):
+        self._flush_pending()
+        return [dict(row) for row in self._connection().execute(sql, params)]
+
+    # Write-behind buffer
+
+    def _write_behind(self, sql, params):
+        if self._closed:
+            # Nothing flushes after close(), so write through
+            self._execute(sql, params)
+            return
+        with self._pending_lock:
+            self._pending.append((sql, params))
+            waiting = len(self._pending)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name='state-store-flush', daemon=True)
+                self._flusher.start()
+        if waiting >= self.flush_rows:
+            self._flush_requested.set()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._flush_requested.wait(self.flush_seconds)
+            self._flush_requested.clear()
+            if self._pending:
+                try:
+                    self._executor.submit(self._flush_pending)
+                except RuntimeError:
+                    # Interpreter shutdown; close() commits the rest
+                    return
+
+    def _flush_pending(self):
+        # Runs on the store thread only
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        db = self._connection()
+        try:
+            with db:
+                for sql, params in batch:
+                    db.execute(sql, params)
+        except sqlite3.Error as e:
+            # The transaction was rolled back; keep the rows for the next flush
+            print(f"State store flush of {len(batch)} rows failed: {e}")
+            with self._pending_lock:
+                self._pending[:0] = batch
+            return
+        self.flushes += 1
+        self.rows_flushed += len(batch)
+
+    async def flush(self):
+        """Commit every buffered write now."""
+        await self._run(self._flush_pending)
+
+    def close(self):
+        """Stop the flusher, commit buffered writes and close the database."""
+        if self._closed:
+            return
+        self._closed = True
+        self._flush_requested.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        # Let queued work finish, then commit the rest from this thread
+        self._executor.shutdown(wait=True)
+        self._flush_pending()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def stats(self):
+        return {
+            'pending': len(self._pending),
+            'flushes': self.flushes,
+            'rows_flushed': self.rows_flushed,
+        }
+
+    # Warnings
+
+    def _add_warning(self, guild_id, user_id, reason, moderator, timestamp):
+        db = self._connection()
+        self._flush_pending()
+        with db:
+            db.execute('INSERT INTO warnings (guild_id, user_id, reason, moderator, timestamp) VALUES (?, ?, ?, ?, ?)',
+                       (str(guild_id), str(user_id), reason, str(moderator), timestamp))
+            return db.execute('SELECT COUNT(*) FROM warnings WHERE guild_id = ? AND user_id = ?',
+                              (str(guild_id), str(user_id))).fetchone()[0]
+
+    async def add_warning(self, guild_id, user_id, reason, moderator, timestamp):
+        """Record a warning and return the user's warning count."""
+        return await self._run(self._add_warning, guild_id, user_id, reason, moderator, timestamp)
+
+    async def get_warnings(self, guild_id, user_id):
+        return await self._run(self._query,
+                               'SELECT reason, moderator, timestamp FROM warnings '
+                               'WHERE guild_id = ? AND user_id = ? ORDER BY id',
+                               (str(guild_id), str(user_id)))
+
+    async def clear_warnings(self, guild_id, user_id):
+        return await self._run(self._execute, 'DELETE FROM warnings WHERE guild_id = ? AND user_id = ?',
+                               (str(guild_id), str(user_id)))
+
+    async def delete_warning(self, guild_id, user_id, warning_index):
+        """Delete the ``warning_index``-th (1-based, oldest first) warning."""
+        return await self._run(self._execute,
+                               'DELETE FROM warnings WHERE id = (SELECT id FROM warnings '
+                               'WHERE guild_id = ? AND user_id = ? ORDER BY id LIMIT 1 OFFSET ?)',
+                               (str(guild_id), str(user_id), warning_index - 1))
+
+    # Verification
+
+    async def record_failed_attempt(self, member_id, email):
+        self._write_behind('INSERT OR REPLACE INTO failed_attempts (member_id, email) VALUES (?, ?)',
+                           (str(member_id), email))
+
+    async def log_verification(self, log_entry):
+        self._write_behind('INSERT INTO verifications (discord_id, discord_username, email, roles, time) '
+                           'VALUES (?, ?, ?, ?, ?)',
+                           (log_entry['discordid'], log_entry['discordusername'], log_entry['email'],
+                            json.dumps(log_entry['roles']), log_entry['time']))
+
+    async def get_verifications(self, discord_id):
+        rows = await self._run(self._query, 'SELECT * FROM verifications WHERE discord_id = ? ORDER BY id',
+                               (discord_id,))
+        for row in rows:
+            row['roles'] = json.loads(row['roles'])
+        return rows
+
+    async def log_username_update(self, log_entry):
+        self._write_behind('INSERT INTO username_updates (discord_id, discord_username, email, old_name, new_name, time) '
+                           'VALUES (?, ?, ?, ?, ?, ?)',
+                           (log_entry['discordid'], log_entry['discordusername'], log_entry['email'],
+                            log_entry['oldname'], log_entry['newname'], log_entry['time']))
+
+    # Email claims: which Discord accounts verified with each canonical email
+
+    def _backfill_email_claims(self, canonical):
+        self._flush_pending()
+        db = self._connection()
+        row = db.execute("SELECT value FROM meta WHERE key = 'email_claims_backfilled'").fetchone()
+        last_id = int(row['value']) if row else 0
+        rows = db.execute('SELECT id, discord_id, email, time FROM verifications WHERE id > ? ORDER BY id',
+                          (last_id,)).fetchall()
+        if not rows:
+            return 0
+        with db:
+            db.executemany('INSERT OR IGNORE INTO email_claims (email, discord_id, claimed) VALUES (?, ?, ?)',
+                           [(canonical(row['email']), row['discord_id'], row['time'])
+                            for row in rows if row['email'] and row['discord_id']])
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('email_claims_backfilled', ?)",
+                       (str(rows[-1]['id']),))
+        return len(rows)
+
+    async def backfill_email_claims(self, canonical):
+        """Add claims for verification log rows not seen by a previous
+        backfill, with emails normalized by ``canonical``; returns the
+        number of log rows read."""
+        return await self._run(self._backfill_email_claims, canonical)
+
+    async def load_email_claims(self):
+        return await self._run(self._query, 'SELECT email, discord_id, claimed FROM email_claims')
+
+    async def save_email_claim(self, email, discord_id, claimed):
+        self._write_behind('INSERT OR IGNORE INTO email_claims (email, discord_id, claimed) VALUES (?, ?, ?)',
+                           (email, int(discord_id), claimed))
+
+    # Verified members: the roles and nickname each account was last given
+
+    def _backfill_verified_members(self):
+        self._flush_pending()
+        db = self._connection()
+        row = db.execute("SELECT value FROM meta WHERE key = 'verified_members_backfilled'").fetchone()
+        last_id = int(row['value']) if row else 0
+        rows = db.execute('SELECT id, discord_id, email, roles, time FROM verifications WHERE id > ? ORDER BY id',
+                          (last_id,)).fetchall()
+        if not rows:
+            return 0
+        with db:
+            # Later log rows replace earlier ones; members already recorded by
+            # a verification keep their nickname
+            db.executemany('INSERT INTO verified_members (discord_id, email, roles, verified) VALUES (?, ?, ?, ?) '
+                           'ON CONFLICT (discord_id) DO UPDATE SET email = excluded.email, roles = excluded.roles, '
+                           'verified = excluded.verified '
+                           "WHERE COALESCE(verified_members.verified, '') < excluded.verified",
+                           [(row['discord_id'], row['email'], row['roles'], row['time'])
+                            for row in rows if row['discord_id']])
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('verified_members_backfilled', ?)",
+                       (str(rows[-1]['id']),))
+        return len(rows)
+
+    async def backfill_verified_members(self):
+        """Record members from verification log rows not seen by a previous
+        backfill; returns the number of log rows read."""
+        return await self._run(self._backfill_verified_members)
+
+    async def load_verified_members(self):
+        rows = await self._run(self._query, 'SELECT * FROM verified_members')
+        for row in rows:
+            row['roles'] = json.loads(row['roles'] or '[]')
+        return rows
+
+    async def save_verified_member(self, discord_id, email, roles, nickname, verified):
+        self._write_behind('INSERT OR REPLACE INTO verified_members (discord_id, email, roles, nickname, verified) '
+                           'VALUES (?, ?, ?, ?, ?)',
+                           (int(discord_id), email, json.dumps(roles), nickname, verified))
+
+    # Welcome messages
+
+    async def load_welcome_messages(self):
+        rows = await self._run(self._query, 'SELECT member_id, message_id, timestamp FROM welcome_messages')
+        return {row['member_id']: {"message_id": row['message_id'], "timestamp": row['timestamp']} for row in rows}
+
+    async def save_welcome_message(self, member_id, message_id, timestamp):
+        self._write_behind('INSERT OR REPLACE INTO welcome_messages (member_id, message_id, timestamp) VALUES (?, ?, ?)',
+                           (int(member_id), message_id, timestamp))
+
+    async def delete_welcome_messages(self, member_ids):
+        for member_id in member_ids:
+            self._write_behind('DELETE FROM welcome_messages WHERE member_id = ?', (int(member_id),))
+
+    # Welcome messages no member needs any more, kept until they are deleted
+
+    async def load_orphaned_welcome_messages(self):
+        rows = await self._run(self._query, 'SELECT message_id FROM orphaned_welcome_messages')
+        return [row['message_id'] for row in rows]
+
+    async def save_orphaned_welcome_message(self, message_id):
+        self._write_behind('INSERT OR IGNORE INTO orphaned_welcome_messages (message_id) VALUES (?)', (message_id,))
+
+    async def delete_orphaned_welcome_messages(self, message_ids):
+        for message_id in message_ids:
+            self._write_behind('DELETE FROM orphaned_welcome_messages WHERE message_id = ?', (message_id,))
+
+    # Long-running jobs; an item without a result has not been processed yet
+
+    def _create_job(self, kind, guild_id, channel_id, requested_by, items, created, params):
+        self._flush_pending()
+        db = self._connection()
+        with db:
+            job_id = db.execute('INSERT INTO jobs (kind, guild_id, channel_id, requested_by, state, created, params) '
+                                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                (kind, guild_id, channel_id, requested_by, 'running', created,
+                                 json.dumps(params or {}))).lastrowid
+            db.executemany('INSERT INTO job_items (job_id, item, target_id, payload, result, detail) '
+                           'VALUES (?, ?, ?, ?, ?, ?)',
+                           [(job_id, item, target_id, json.dumps(payload), result, detail)
+                            for item, (target_id, payload, result, detail) in enumerate(items)])
+        return job_id
+
+    async def create_job(self, kind, guild_id, channel_id, requested_by, items, created, params=None):
+        """Persist a job, its ``params`` and its ``(target_id, payload, result,
+        detail)`` items (``result`` None for items still to process); returns
+        the job ID."""
+        return await self._run(self._create_job, kind, guild_id, channel_id, requested_by, list(items),
+                               created, params)
+
+    async def set_job_message(self, job_id, message_id):
+        await self._run(self._execute, 'UPDATE jobs SET message_id = ? WHERE id = ?', (message_id, job_id))
+
+    async def finish_job(self, job_id, state, finished):
+        await self._run(self._execute, 'UPDATE jobs SET state = ?, finished = ? WHERE id = ?', (state, finished, job_id))
+
+    async def _jobs(self, where, params):
+        rows = await self._run(self._query, f'SELECT * FROM jobs {where}', params)
+        for row in rows:
+            row['params'] = json.loads(row['params'] or '{}')
+        return rows
+
+    async def get_job(self, job_id):
+        rows = await self._jobs('WHERE id = ?', (job_id,))
+        return rows[0] if rows else None
+
+    async def running_jobs(self, kind=None):
+        if kind is None:
+            return await self._jobs("WHERE state = 'running' ORDER BY id", ())
+        return await self._jobs("WHERE kind = ? AND state = 'running' ORDER BY id", (kind,))
+
+    async def recent_jobs(self, limit=10):
+        return await self._jobs('ORDER BY id DESC LIMIT ?', (limit,))
+
+    async def get_job_items(self, job_id, pending_only=False):
+        rows = await self._run(self._query,
+                               'SELECT item, target_id, payload, result, detail FROM job_items WHERE job_id = ?'
+                               + (' AND result IS NULL' if pending_only else '') + ' ORDER BY item',
+                               (job_id,))
+        for row in rows:
+            row['payload'] = json.loads(row['payload'])
+        return rows
+
+    async def record_job_item(self, job_id, item, result, detail=''):
+        self._write_behind('UPDATE job_items SET result = ?, detail = ? WHERE job_id = ? AND item = ?',
+                           (result, detail, job_id, item))
+
+    async def job_result_counts(self, job_id):
+        rows = await self._run(self._query,
+                               "SELECT COALESCE(result, 'pending') AS result, COUNT(*) AS count FROM job_items "
+                               'WHERE job_id = ? GROUP BY result', (job_id,))
+        return {row['result']: row['count'] for row in rows}
+
+    async def job_failure_details(self, job_id, results, limit=5):
+        """Most common ``(result, detail, count)`` among items that ended in ``results``."""
+        results = list(results)
+        if not results:
+            return []
+        rows = await self._run(self._query,
+                               'SELECT result, detail, COUNT(*) AS count FROM job_items WHERE job_id = ? '
+                               f"AND result IN ({', '.join('?' * len(results))}) "
+                               'GROUP BY result, detail ORDER BY count DESC LIMIT ?',
+                               (job_id, *results, limit))
+        return [(row['result'], row['detail'], row['count']) for row in rows]
+
+    # Import of the old JSON files
+
+    def _import_legacy_files(self, directory):
+        self._flush_pending()
+        db = self._connection()
+        imported = {}
+        for table, file_names in LEGACY_FILES.items():
+            for file_name in file_names:
+                path = os.path.join(directory, file_name)
+                if not os.path.exists(path) or db.execute('SELECT 1 FROM meta WHERE key = ?',
+                                                          (f"imported:{file_name}",)).fetchone():
+                    continue
+                rows = _legacy_rows(table, path)
+                if rows is None:
+                    print(f"Could not parse {path}, not importing it")
+                    continue
+                with db:
+                    _insert_legacy_rows(db, table, rows)
+                    db.execute('INSERT INTO meta (key, value) VALUES (?, ?)', (f"imported:{file_name}", str(len(rows))))
+                imported[file_name] = len(rows)
+        return imported
+
+    async def import_legacy_files(self, directory='.'):
+        """Import every JSON/JSONL state file from older versions once.
+
+        Returns ``{file_name: rows_imported}`` for the files imported now.
+        """
+        return await self._run(self._import_legacy_files, directory)
+
+def _load_json(path, default):
+    if os.stat(path).st_size == 0:
+        return default
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        return None
+
+def _legacy_rows(table, path):
+    if path.endswith('.jsonl'):
+        return read_jsonl(path)
+    data = _load_json(path, {} if table in ('warnings', 'failed_attempts', 'welcome_messages') else [])
+    if data is None:
+        return None
+    if table == 'warnings':
+        # {guild_id: {user_id: {"count": n, "warnings": [...]}}}
+        return [(guild_id, user_id, warning) for guild_id, users in data.items()
+                for user_id, entry in users.items() for warning in entry.get('warnings', [])]
+    if table in ('failed_attempts', 'welcome_messages'):
+        return list(data.items())
+    return data
+
+def _insert_legacy_rows(db, table, rows):
+    if table == 'warnings':
+        db.executemany('INSERT INTO warnings (guild_id, user_id, reason, moderator, timestamp) VALUES (?, ?, ?, ?, ?)',
+                       [(guild_id, user_id, warning.get('reason'), warning.get('moderator'), warning.get('timestamp'))
+                        for guild_id, user_id, warning in rows])
+    elif table == 'failed_attempts':
+        db.executemany('INSERT OR REPLACE INTO failed_attempts (member_id, email) VALUES (?, ?)', rows)
+    elif table == 'welcome_messages':
+        db.executemany('INSERT OR REPLACE INTO welcome_messages (member_id, message_id, timestamp) VALUES (?, ?, ?)',
+                       [(int(member_id), entry['message_id'], entry['timestamp']) for member_id, entry in rows])
+    elif table == 'verifications':
+        db.executemany('INSERT INTO verifications (discord_id, discord_username, email, roles, time) '
+                       'VALUES (?, ?, ?, ?, ?)',
+                       [(entry.get('discordid'), entry.get('discordusername'), entry.get('email'),
+                         json.dumps(entry.get('roles', [])), entry.get('time')) for entry in rows])
+    elif table == 'username_updates':
+        db.executemany('INSERT INTO username_updates (discord_id, discord_username, email, old_name, new_name, time) '
+                       'VALUES (?, ?, ?, ?, ?, ?)',
+                       [(entry.get('discordid'), entry.get('discordusername'), entry.get('email'),
+                         entry.get('oldname'), entry.get('newname'), entry.get('time')) for entry in rows])
+
+store = StateStore()
+# Commit buffered writes on interpreter exit
+atexit.register(store.close)
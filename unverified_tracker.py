@@ -0,0 +1,66 @@
+import asyncio
+from array import array
+
+# Members visited between yields to the event loop while seeding
+SEED_CHUNK = 1000
+
+def is_unverified(member):
+    """A member still needing roles: nothing besides @everyone and at most
+    one other role (usually the auto-assigned unverified role)."""
+    return not member.bot and len(member.roles) <= 2
+
+class UnverifiedTracker:
+    """IDs of the guild's unverified members, kept current incrementally.
+
+    Seeded once from a chunked scan of the member cache when the bot is
+    ready, then updated from the member join/update/remove events, so
+    ``/cacheunverified`` answers from ``len()`` instead of walking every
+    member and nothing holds on to Member objects.
+    """
+
+    def __init__(self):
+        self._ids = set()
+        self.seeded = False
+
+    async def seed(self, guild, chunk_size=SEED_CHUNK):
+        """Scan ``guild``'s members ``chunk_size`` at a time, yielding to the
+        event loop between chunks; returns the number of unverified members."""
+        if not guild.chunked:
+            await guild.chunk()
+        member_ids = [member.id for member in guild.members]
+        for start in range(0, len(member_ids), chunk_size):
+            for member_id in member_ids[start:start + chunk_size]:
+                # Look the member up again: events may have changed or removed
+                # them since the ID list was taken
+                member = guild.get_member(member_id)
+                if member is not None and is_unverified(member):
+                    self._ids.add(member_id)
+                else:
+                    self._ids.discard(member_id)
+            await asyncio.sleep(0)
+        self.seeded = True
+        return len(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, member_id):
+        return member_id in self._ids
+
+    def snapshot(self):
+        """Sorted unverified member IDs as a compact unsigned 64-bit array."""
+        return array('Q', sorted(self._ids))
+
+    # Event hooks
+
+    def member_joined(self, member):
+        self.member_updated(member)
+
+    def member_updated(self, member):
+        if is_unverified(member):
+            self._ids.add(member.id)
+        else:
+            self._ids.discard(member.id)
+
+    def member_removed(self, member):
+        self._ids.discard(member.id)
@@ -0,0 +1,36 @@
+from state_store import store
+
+class VerifiedMemberIndex:
+    """The email, roles and nickname each verified member had, so a member
+    who leaves and rejoins can be restored without verifying again.
+
+    Persisted in the state store's ``verified_members`` table, backfilled
+    from the verification log and held in memory, so a join is a dict
+    probe instead of a query that commits the store's write buffer.
+    """
+
+    def __init__(self):
+        self._by_member = {}
+
+    async def load(self):
+        """Backfill members from new verification log rows, then load them
+        all; returns the number of verified members."""
+        await store.backfill_verified_members()
+        self._by_member = {row['discord_id']: row for row in await store.load_verified_members()}
+        return len(self._by_member)
+
+    def __len__(self):
+        return len(self._by_member)
+
+    def get(self, discord_id):
+        return self._by_member.get(discord_id)
+
+    async def save(self, discord_id, email, roles, nickname, verified):
+        self._by_member[discord_id] = {
+            'discord_id': discord_id,
+            'email': email,
+            'roles': list(roles),
+            'nickname': nickname,
+            'verified': verified
+        }
+        await store.save_verified_member(discord_id, email, roles, nickname, verified)
@@ -0,0 +1,291 @@
+import asyncio
+import heapq
+import os
+import time
+from collections import deque
+from datetime import datetime, timezone
+import discord
+from dotenv import load_dotenv
+from state_store import store
+
+load_dotenv()
+
+# How long a welcome message stays up if the member does not verify
+WELCOME_TTL = float(os.getenv('WELCOME_MESSAGE_TTL_MINUTES', '60')) * 60
+
+# Deadlines this close together are deleted in the same request
+COALESCE_SECONDS = 5
+
+# Longest a join waits to be welcomed together with others during a surge
+WELCOME_BATCH_MAX_SECONDS = float(os.getenv('WELCOME_BATCH_MAX_SECONDS', '5'))
+
+# Joins counted over this many seconds to size the batching window
+JOIN_RATE_SECONDS = 10
+
+# Per welcome message: Discord's length limit, and a cap on mentions
+MESSAGE_LIMIT = 2000
+MENTIONS_PER_MESSAGE = 50
+
+WELCOME_TEXT = ("Welcome to the server, {mentions}! To get access to GSSoC, please verify your selection "
+                "by using the command `/verify registered-email-id`")
+
+# Discord's bulk delete takes 2-100 messages, none older than 14 days
+BULK_DELETE_LIMIT = 100
+BULK_DELETE_MAX_AGE = 14 * 24 * 3600 - 60
+
+# Wait before retrying a welcome message whose delete failed
+DELETE_RETRY_SECONDS = 300
+
+class WelcomeTracker:
+    """Pending welcome messages and the schedule that deletes them.
+
+    Each message is pushed on a min-heap at its deadline, and one task sleeps
+    until the earliest one is due. Messages due within ``COALESCE_SECONDS``
+    of each other are removed in one bulk delete of up to 100 IDs, without
+    fetching them first. A message whose members have all verified is
+    scheduled for now, so it joins the next batch. A message is forgotten
+    only once it is gone; one whose delete fails is retried later. The
+    entries live in the state store, so the schedule is rebuilt after a
+    restart.
+    """
+
+    def __init__(self, ttl=WELCOME_TTL):
+        self.ttl = ttl
+        self.entries = {}
+        self._members_by_message = {}
+        # Messages no member refers to any more, waiting for deletion
+        self._orphaned = set()
+        self._heap = []
+        self._wake = None
+        self._task = None
+        self.channel = None
+        self.deleted = 0
+        self.bulk_requests = 0
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    async def start(self, channel):
+        """Load the saved messages and start deleting them as they expire."""
+        self.channel = channel
+        self._wake = asyncio.Event()
+        self.entries = await store.load_welcome_messages()
+        self._members_by_message = {}
+        self._orphaned = set()
+        self._heap = []
+        for member_id, entry in self.entries.items():
+            self._add(member_id, entry["message_id"], datetime.fromisoformat(entry["timestamp"]).timestamp())
+        # Forgotten before a restart but not deleted yet
+        now = time.time()
+        for message_id in await store.load_orphaned_welcome_messages():
+            if message_id not in self._members_by_message:
+                self._orphaned.add(message_id)
+                heapq.heappush(self._heap, (now, message_id))
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return len(self._members_by_message)
+
+    def _add(self, member_id, message_id, created):
+        members = self._members_by_message.setdefault(message_id, set())
+        if not members:
+            heapq.heappush(self._heap, (created + self.ttl, message_id))
+        members.add(member_id)
+
+    def _schedule(self, message_id, deadline):
+        heapq.heappush(self._heap, (deadline, message_id))
+        if self._wake is not None:
+            self._wake.set()
+
+    def __len__(self):
+        return len(self.entries)
+
+    async def track(self, member_id, message_id):
+        """Remember ``message_id`` as ``member_id``'s welcome message."""
+        await self.forget(member_id)
+        timestamp = datetime.now(timezone.utc)
+        self.entries[member_id] = {"message_id": message_id, "timestamp": timestamp.isoformat()}
+        self._add(member_id, message_id, timestamp.timestamp())
+        if self._wake is not None:
+            self._wake.set()
+        await store.save_welcome_message(member_id, message_id, self.entries[member_id]["timestamp"])
+
+    async def forget(self, member_id):
+        """Drop ``member_id``'s welcome message (e.g. once they verify). The
+        message is deleted with the next batch when nobody else needs it."""
+        entry = self.entries.pop(member_id, None)
+        if entry is None:
+            return
+        message_id = entry["message_id"]
+        members = self._members_by_message.get(message_id)
+        if members is not None:
+            members.discard(member_id)
+        await store.delete_welcome_messages([member_id])
+        if members is None:
+            return
+        if not members:
+            del self._members_by_message[message_id]
+            self._orphaned.add(message_id)
+            # The member's row is gone, so this row keeps the message until it is deleted
+            await store.save_orphaned_welcome_message(message_id)
+            self._schedule(message_id, time.time())
+
+    async def _run(self):
+        while True:
+            timeout = max(0, self._heap[0][0] - time.time()) if self._heap else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            due = []
+            horizon = time.time() + COALESCE_SECONDS
+            while self._heap and self._heap[0][0] <= horizon:
+                _, message_id = heapq.heappop(self._heap)
+                if message_id not in due and (message_id in self._orphaned or message_id in self._members_by_message):
+                    due.append(message_id)
+            if due:
+                try:
+                    await self._expire(due)
+                except Exception as e:
+                    print(f"Error deleting expired welcome messages: {e}")
+
+    async def _expire(self, message_ids):
+        if self.channel is None:
+            deleted, failed = [], message_ids
+        else:
+            deleted, failed = await self._delete(message_ids)
+        member_ids = []
+        orphaned = []
+        for message_id in deleted:
+            if message_id in self._orphaned:
+                self._orphaned.discard(message_id)
+                orphaned.append(message_id)
+            for member_id in self._members_by_message.pop(message_id, ()):
+                self.entries.pop(member_id, None)
+                member_ids.append(member_id)
+        if member_ids:
+            await store.delete_welcome_messages(member_ids)
+        if orphaned:
+            await store.delete_orphaned_welcome_messages(orphaned)
+        # Still tracked, so the next attempt finds them
+        retry = time.time() + DELETE_RETRY_SECONDS
+        for message_id in failed:
+            heapq.heappush(self._heap, (retry, message_id))
+
+    async def _delete(self, message_ids):
+        """Delete ``message_ids`` from the channel; returns ``(deleted, failed)``,
+        where messages that were already gone count as deleted."""
+        # Bulk delete rejects messages older than 14 days; those go one by one
+        cutoff = time.time() - BULK_DELETE_MAX_AGE
+        recent = [message_id for message_id in message_ids
+                  if discord.utils.snowflake_time(message_id).timestamp() > cutoff]
+        old = [message_id for message_id in message_ids if message_id not in recent]
+        deleted, failed = [], []
+        for start in range(0, len(recent), BULK_DELETE_LIMIT):
+            batch = recent[start:start + BULK_DELETE_LIMIT]
+            if len(batch) == 1:
+                old.extend(batch)
+                continue
+            try:
+                # Unknown IDs are skipped by Discord rather than failing the batch
+                await self.channel.delete_messages([discord.Object(id=message_id) for message_id in batch])
+                self.bulk_requests += 1
+                self.deleted += len(batch)
+                deleted.extend(batch)
+            except discord.HTTPException as e:
+                # Bulk delete needs Manage Messages; the bot can still delete its own messages
+                print(f"Bulk delete of {len(batch)} welcome messages failed, deleting them one by one: {e}")
+                old.extend(batch)
+        for message_id in old:
+            try:
+                await self.channel.get_partial_message(message_id).delete()
+                self.deleted += 1
+            except discord.NotFound:
+                pass
+            except discord.HTTPException as e:
+                print(f"Could not delete welcome message {message_id}, retrying later: {e}")
+                failed.append(message_id)
+                continue
+            deleted.append(message_id)
+        return deleted, failed
+
+class WelcomeDispatcher:
+    """Welcomes new members, folding a surge of joins into shared messages.
+
+    A join during a quiet period is welcomed right away. When joins come
+    faster, each batch waits a little longer (up to
+    ``WELCOME_BATCH_MAX_SECONDS``) so one message mentions everyone who
+    joined meanwhile. A batch is split into as many messages as the
+    mention and length limits need, and each member is tracked against
+    the message that welcomed them.
+    """
+
+    def __init__(self, tracker, max_window=WELCOME_BATCH_MAX_SECONDS):
+        self.tracker = tracker
+        self.max_window = max_window
+        self._joins = deque()
+        self._pending = []
+        self._flush_task = None
+        self.welcomed = 0
+        self.messages_sent = 0
+
+    def window(self):
+        """Seconds to hold the next batch open, from the recent join rate."""
+        cutoff = time.monotonic() - JOIN_RATE_SECONDS
+        while self._joins and self._joins[0] < cutoff:
+            self._joins.popleft()
+        if len(self._joins) <= 1:
+            return 0
+        return min(self.max_window, 0.25 * len(self._joins))
+
+    async def welcome(self, channel, member):
+        self._joins.append(time.monotonic())
+        self._pending.append(member)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_after(channel, self.window()))
+
+    async def _flush_after(self, channel, delay):
+        await asyncio.sleep(delay)
+        members, self._pending = self._pending, []
+        # Members who left while the batch was open, or who already have a
+        # tracked welcome message, need no (second) welcome
+        members = [member for member in members
+                   if member.guild.get_member(member.id) is not None and member.id not in self.tracker.entries]
+        # Each message is sent on its own, so one failure does not drop the rest
+        for batch in split_mentions(members):
+            try:
+                message = await channel.send(
+                    WELCOME_TEXT.format(mentions=", ".join(member.mention for member in batch)),
+                    allowed_mentions=discord.AllowedMentions(users=True)
+                )
+            except discord.HTTPException as e:
+                print(f"Could not send welcome message for {len(batch)} members: {e}")
+                continue
+            self.messages_sent += 1
+            self.welcomed += len(batch)
+            for member in batch:
+                await self.tracker.track(member.id, message.id)
+        if len(members) > 1:
+            print(f"Welcomed {len(members)} new members together")
+        # Joins that arrived while this batch was being sent
+        if self._pending:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_after(channel, self.window()))
+
+def split_mentions(members):
+    """Split ``members`` into groups whose welcome message fits the limits."""
+    room = MESSAGE_LIMIT - len(WELCOME_TEXT.format(mentions=''))
+    batch, length = [], 0
+    for member in members:
+        extra = len(member.mention) + (2 if batch else 0)
+        if batch and (len(batch) >= MENTIONS_PER_MESSAGE or length + extra > room):
+            yield batch
+            batch, length = [], 0
+            extra = len(member.mention)
+        batch.append(member)
+        length += extra
+    if batch:
+        yield batch
+
+welcome_tracker = WelcomeTracker()
+welcome_dispatcher = WelcomeDispatcher(welcome_tracker)